@@ -6,10 +6,16 @@ load_dotenv()
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_ENVIRONMENT = os.getenv("PINECONE_ENVIRONMENT", "us-east-1-aws")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "nptel-video-search")
+# Threads for concurrent Pinecone requests, and vectors per upsert request
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "30"))
+PINECONE_BATCH_SIZE = int(os.getenv("PINECONE_BATCH_SIZE", "100"))
 
 # Model for embeddings - using a good multilingual model
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
+# Compile the embedding model with torch.compile (PyTorch 2+); mainly pays off on GPU
+EMBEDDING_TORCH_COMPILE = os.getenv("EMBEDDING_TORCH_COMPILE", "false").lower() == "true"
+
 # Chunk size for transcript segmentation
 CHUNK_SIZE = 500  # characters
 CHUNK_OVERLAP = 100  # characters
@@ -17,3 +23,50 @@ CHUNK_OVERLAP = 100  # characters
 # YouTube API settings
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "")
 
+
+# Number of transcript windows sent to the LLM in a single chapter request
+LLM_WINDOWS_PER_REQUEST = int(os.getenv("LLM_WINDOWS_PER_REQUEST", "4"))
+
+# Seconds between starting LLM requests (Gemini Free Tier is ~15 RPM)
+LLM_REQUEST_INTERVAL = float(os.getenv("LLM_REQUEST_INTERVAL", "4"))
+
+# Maximum number of chapter-generation requests in flight at once
+LLM_MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "8"))
+
+# Directory for on-disk caches (generated chapters, transcripts)
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+# Uvicorn worker processes; each worker lazily loads its own models,
+# so lower this (e.g. to 1) when GPU memory is the limit
+UVICORN_WORKERS = int(os.getenv("UVICORN_WORKERS", str(min(os.cpu_count() or 1, 4))))
+
+# Seconds a worker keeps failing fast after a service (LLM, Neo4j) failed to initialize
+# before the next request retries it
+SERVICE_RETRY_SECONDS = float(os.getenv("SERVICE_RETRY_SECONDS", "30"))
+
+# Search result cache: LRU size and cosine similarity for reusing a similar query's results
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_THRESHOLD = float(os.getenv("SEARCH_CACHE_THRESHOLD", "0.95"))
+# Seconds a cached search result is reused; each worker has its own cache and only the
+# worker that ingests a playlist clears it, so this bounds how stale the others can get
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "60"))
+
+# Cosine similarity above which the legacy RAG search reuses a paraphrased query's results
+RAG_CACHE_THRESHOLD = float(os.getenv("RAG_CACHE_THRESHOLD", "0.86"))
+# Seconds the RAG search reuses cached clips; nothing invalidates them after re-ingesting
+# into Pinecone, so this bounds how long stale clips are served
+RAG_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", "300"))
+
+# Videos whose captions/audio are fetched concurrently during playlist ingestion
+TRANSCRIPT_WORKERS = int(os.getenv("TRANSCRIPT_WORKERS", "8"))
+# Videos the streaming ingest hands to chapter generation at once, while the rest
+# of the playlist is still downloading
+INGEST_GROUP_SIZE = int(os.getenv("INGEST_GROUP_SIZE", "4"))
+
+# Whisper fallback transcription: model size (English-only, audio is always transcribed
+# as English), and CTranslate2 compute type for faster-whisper
+# (empty = int8 on CPU, int8_float16 on GPU)
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny.en")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "")
+# Audio chunks per batched faster-whisper forward pass (1 disables batching)
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "16"))
@@ -2,16 +2,35 @@
 Service for creating vector embeddings from transcripts
 """
 from sentence_transformers import SentenceTransformer
-from backend.config import EMBEDDING_MODEL, CHUNK_SIZE, CHUNK_OVERLAP
+from sentence_transformers.util import batch_to_device
+from backend.config import EMBEDDING_MODEL, EMBEDDING_TORCH_COMPILE, CHUNK_SIZE, CHUNK_OVERLAP, CACHE_DIR
 from typing import List, Dict
+import hashlib
+import logging
+import os
+import uuid
 import numpy as np
+import torch
 
 
+logger = logging.getLogger("nptel.embedding_service")
+
 class EmbeddingService:
     def __init__(self):
-        print(f"Loading embedding model: {EMBEDDING_MODEL}")
+        logger.info("Loading embedding model: %s", EMBEDDING_MODEL)
         self.model = SentenceTransformer(EMBEDDING_MODEL)
-        print("Embedding model loaded successfully")
+        # Inference only; create_embedding_single calls the model directly, so disable dropout here
+        self.model.eval()
+
+        if EMBEDDING_TORCH_COMPILE and hasattr(torch, "compile"):
+            # Compile the transformer inside the pipeline; dynamic shapes since text lengths vary.
+            # The first calls (startup warmup) pay the compilation cost.
+            transformer = self.model[0]
+            transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
+            logger.info("Embedding model compiled with torch.compile")
+        logger.info("Embedding model loaded successfully")
+
+        self.cache_dir = os.path.join(CACHE_DIR, "embeddings")
 
     def create_chunks(self, transcript_segments: List[Dict]) -> List[Dict]:
         """
@@ -78,13 +97,63 @@ class EmbeddingService:
         
         return chunks
 
-    def create_embeddings(self, texts: List[str]) -> np.ndarray:
+    def create_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
         """
-        Create embeddings for a list of texts
+        Create unit-length embeddings for a list of texts, so cosine similarity is a dot product
+        (encode sorts texts by length internally, so mixed lengths batch well)
         """
-        embeddings = self.model.encode(texts, show_progress_bar=True)
+        with torch.inference_mode():
+            embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                           normalize_embeddings=True, show_progress_bar=False)
         return embeddings
 
+    def create_embedding_single(self, text: str) -> np.ndarray:
+        """
+        Fast path for one text (e.g. a search query): tokenize and run the model
+        directly instead of going through encode's batching machinery
+        """
+        features = batch_to_device(self.model.tokenize([text]), self.model.device)
+        with torch.inference_mode():
+            embedding = self.model(features)['sentence_embedding']
+            embedding = torch.nn.functional.normalize(embedding, p=2, dim=-1)
+        return embedding[0].float().cpu().numpy()
+
+    def create_embeddings_cached(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Same as create_embeddings, but reuses embeddings stored on disk for
+        identical texts (keyed by model and text hash), so re-runs only encode new text
+        """
+        paths = [self._cache_path(text) for text in texts]
+        embeddings = [None] * len(texts)
+        missing = []
+
+        for i, path in enumerate(paths):
+            try:
+                embeddings[i] = np.load(path)
+            except (OSError, ValueError):
+                missing.append(i)
+
+        if missing:
+            new_embeddings = self.create_embeddings([texts[i] for i in missing], batch_size)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+                try:
+                    # Write to a temp file and rename so readers never see a partial file
+                    tmp_path = f"{paths[i]}.{uuid.uuid4().hex}.tmp"
+                    with open(tmp_path, 'wb') as f:
+                        np.save(f, embedding)
+                    os.replace(tmp_path, paths[i])
+                except OSError as e:
+                    logger.warning("Could not cache embedding: %s", e)
+
+        logger.info("Embeddings: %d cached, %d computed", len(texts) - len(missing), len(missing))
+        return np.stack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+
+    def _cache_path(self, text: str) -> str:
+        key = hashlib.blake2b(f"{EMBEDDING_MODEL}\n{text}".encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
     def prepare_transcript_for_embedding(self, video_data: Dict) -> List[Dict]:
         """
         Prepare transcript segments with video metadata for embedding
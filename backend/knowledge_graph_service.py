@@ -2,9 +2,14 @@
 from neo4j import GraphDatabase
 from typing import List, Dict, Any, Optional
 import numpy as np
-from scipy.spatial.distance import cosine
 import os
 
+try:
+    # Optional SIMD kernels for the all-pairs similarity pass
+    import simsimd
+except ImportError:
+    simsimd = None
+
 class KnowledgeGraphService:
     def __init__(self, neo4j_driver=None):
         if neo4j_driver:
@@ -96,60 +101,74 @@ class KnowledgeGraphService:
 
         return chapters
 
-    def _create_similarity_relationships(self, session, chapters: List[Dict],
-                                        threshold: float, max_connections: int) -> int:
+    def compute_similarity_matrix(self, embeddings: np.ndarray, others: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Create SIMILAR_TO and RELATES_TO relationships based on cosine similarity
+        Cosine similarity between every row of embeddings and every row of others
+        (defaults to embeddings itself), in one vectorized call
         """
-        relationships_created = 0
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        others = embeddings if others is None else np.asarray(others, dtype=np.float32)
 
-        # Compute similarity matrix
-        for i, chapter1 in enumerate(chapters):
-            similarities = []
+        if simsimd is not None:
+            return 1.0 - np.asarray(simsimd.cdist(embeddings, others, metric='cosine'), dtype=np.float32)
 
-            for j, chapter2 in enumerate(chapters):
-                if i == j:
-                    continue
+        return self._unit_rows(embeddings) @ self._unit_rows(others).T
 
-                # Skip if same video (already have NEXT_TOPIC)
-                if chapter1['video_id'] == chapter2['video_id']:
-                    continue
+    @staticmethod
+    def _unit_rows(embeddings: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
 
-                # Compute cosine similarity
-                emb1 = np.array(chapter1['embedding'])
-                emb2 = np.array(chapter2['embedding'])
-
-                similarity = 1 - cosine(emb1, emb2)
-
-                if similarity >= threshold:
-                    similarities.append({
-                        'chapter2_id': chapter2['chapter_id'],
-                        'similarity': similarity
+    def _create_similarity_relationships(self, session, chapters: List[Dict],
+                                        threshold: float, max_connections: int) -> int:
+        """
+        Create SIMILAR_TO and RELATES_TO relationships based on cosine similarity
+        """
+        embeddings = np.array([chapter['embedding'] for chapter in chapters], dtype=np.float32)
+        video_ids = np.array([chapter['video_id'] for chapter in chapters])
+        relationships = {"SIMILAR_TO": [], "RELATES_TO": []}
+
+        # Compute the similarity matrix a block of rows at a time to bound memory
+        block_size = 1024
+        for block_start in range(0, len(chapters), block_size):
+            block = slice(block_start, block_start + block_size)
+            similarity = self.compute_similarity_matrix(embeddings[block], embeddings)
+
+            # Skip pairs from the same video (already have NEXT_TOPIC), including i == j
+            similarity[video_ids[block, None] == video_ids[None, :]] = -np.inf
+
+            for row_idx, row in enumerate(similarity):
+                i = block_start + row_idx
+
+                # Take the top max_connections above the threshold, by similarity
+                candidates = np.flatnonzero(row >= threshold)
+                top_similar = candidates[np.argsort(-row[candidates], kind='stable')][:max_connections]
+
+                for j in top_similar:
+                    # High similarity (>0.85) = SIMILAR_TO, else RELATES_TO
+                    rel_type = "SIMILAR_TO" if row[j] > 0.85 else "RELATES_TO"
+                    relationships[rel_type].append({
+                        'id1': chapters[i]['chapter_id'],
+                        'id2': chapters[j]['chapter_id'],
+                        'similarity': float(row[j])
                     })
 
-            # Sort by similarity and take top max_connections
-            similarities.sort(key=lambda x: x['similarity'], reverse=True)
-            top_similar = similarities[:max_connections]
-
-            # Create relationships in Neo4j
-            for sim in top_similar:
-                # High similarity (>0.85) = SIMILAR_TO, else RELATES_TO
-                rel_type = "SIMILAR_TO" if sim['similarity'] > 0.85 else "RELATES_TO"
-
-                session.run(f"""
-                MATCH (c1:Chapter), (c2:Chapter)
-                WHERE id(c1) = $id1 AND id(c2) = $id2
-                MERGE (c1)-[r:{rel_type}]->(c2)
-                SET r.similarity = $similarity
-                """, id1=chapter1['chapter_id'], id2=sim['chapter2_id'],
-                     similarity=sim['similarity'])
-
-                relationships_created += 1
-
-            if (i + 1) % 10 == 0:
-                print(f"  Processed {i + 1}/{len(chapters)} chapters...")
-
-        return relationships_created
+            print(f"  Processed {min(block_start + block_size, len(chapters))}/{len(chapters)} chapters...")
+
+        # Create relationships in Neo4j, one statement per relationship type
+        for rel_type, pairs in relationships.items():
+            if not pairs:
+                continue
+            session.run(f"""
+            UNWIND $pairs AS pair
+            MATCH (c1:Chapter), (c2:Chapter)
+            WHERE id(c1) = pair.id1 AND id(c2) = pair.id2
+            MERGE (c1)-[r:{rel_type}]->(c2)
+            SET r.similarity = pair.similarity
+            """, pairs=pairs)
+
+        return sum(len(pairs) for pairs in relationships.values())
 
     def _create_prerequisite_relationships(self, session):
         """
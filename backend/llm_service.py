@@ -1,9 +1,18 @@
 
 import google.generativeai as genai
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import asyncio
 import json
+import logging
+import threading
 import time
+import uuid
+from backend.config import (
+    CACHE_DIR, LLM_WINDOWS_PER_REQUEST, LLM_REQUEST_INTERVAL, LLM_MAX_CONCURRENT_REQUESTS
+)
+
+logger = logging.getLogger("nptel.llm_service")
 
 class LLMService:
     def __init__(self):
@@ -15,111 +24,318 @@ class LLMService:
         # Use a model that is available in the user's account
         self.model = genai.GenerativeModel('gemini-2.0-flash')
 
-    def generate_chapters(self, transcript_segments: List[Dict], video_duration: float) -> List[Dict]:
+        self.cache_dir = os.path.join(CACHE_DIR, "chapters")
+        # Earliest start of the next request, shared by all calls on this service (sync,
+        # async, concurrent playlists) so together they stay LLM_REQUEST_INTERVAL apart
+        self._next_request_at = 0.0
+        self._next_request_lock = threading.Lock()
+        # Caps in-flight async requests across all calls; created in the running loop
+        self._request_semaphore: Optional[asyncio.Semaphore] = None
+
+    def generate_chapters(self, transcript_segments: List[Dict], video_duration: float,
+                          cache_key: Optional[str] = None) -> List[Dict]:
+        """
+        Generate chapters from transcript using sliding window approach.
+        If cache_key is given (e.g. video id + transcript hash), chapters are
+        read from / written to the on-disk cache so re-runs skip the LLM.
+        """
+        chapters_per_video, _ = self.generate_chapters_batch([transcript_segments], [cache_key])
+        return chapters_per_video[0]
+
+    def generate_chapters_batch(self, transcripts: List[List[Dict]],
+                                cache_keys: Optional[List[Optional[str]]] = None) -> Tuple[List[List[Dict]], List[bool]]:
         """
-        Generate chapters from transcript using sliding window approach
+        Generate chapters for several videos at once.
+        Windows from all videos are packed LLM_WINDOWS_PER_REQUEST at a time into
+        a single prompt, so a playlist needs far fewer (rate limited) requests
+        than one request per window. Returns one chapter list per transcript, and
+        per transcript whether every window got a real LLM chapter (False if some
+        came from the quota fallback or failed), so callers can retry the rest later.
+        """
+        if cache_keys is None:
+            cache_keys = [None] * len(transcripts)
+        results, generated_videos, batches = self._prepare_batches(transcripts, cache_keys)
+
+        generated_batches = []
+        for batch_num, batch in enumerate(batches):
+            # Rate limiting between requests
+            # Gemini Free Tier is ~15 RPM (1 request every 4 seconds)
+            time.sleep(self._reserve_request_slot())
+            generated_batches.append(self._generate_window_batch([window for _, _, window in batch], batch_num))
+
+        return self._collect_batches(results, generated_videos, batches, generated_batches, cache_keys)
+
+    async def generate_chapters_batch_async(self, transcripts: List[List[Dict]],
+                                            cache_keys: Optional[List[Optional[str]]] = None) -> Tuple[List[List[Dict]], List[bool]]:
+        """
+        Async version of generate_chapters_batch.
+        Requests still start LLM_REQUEST_INTERVAL seconds apart (also across calls),
+        but no longer wait for the previous response; at most
+        LLM_MAX_CONCURRENT_REQUESTS are in flight across all calls.
+        """
+        if cache_keys is None:
+            cache_keys = [None] * len(transcripts)
+        results, generated_videos, batches = self._prepare_batches(transcripts, cache_keys)
+        if self._request_semaphore is None:
+            self._request_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENT_REQUESTS)
+        semaphore = self._request_semaphore
+
+        async def run_batch(batch_num: int, batch: List[tuple], delay: float) -> List[tuple]:
+            # Stagger request starts to stay within the rate limit
+            await asyncio.sleep(delay)
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self._generate_window_batch, [window for _, _, window in batch], batch_num
+                )
+
+        generated_batches = await asyncio.gather(
+            *(run_batch(batch_num, batch, self._reserve_request_slot()) for batch_num, batch in enumerate(batches)),
+            return_exceptions=True
+        )
+
+        # A failed request leaves its windows without chapters, like any other LLM error
+        for batch_num, (batch, generated) in enumerate(zip(batches, generated_batches)):
+            if isinstance(generated, BaseException):
+                logger.error("Error generating chapters for request %d: %s", batch_num, generated)
+                generated_batches[batch_num] = [(None, False)] * len(batch)
+
+        return self._collect_batches(results, generated_videos, batches, generated_batches, cache_keys)
+
+    def _reserve_request_slot(self) -> float:
+        """
+        Return how long to wait before starting the next request
+        """
+        with self._next_request_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request_at)
+            self._next_request_at = start + LLM_REQUEST_INTERVAL
+        return start - now
+
+    def _prepare_batches(self, transcripts: List[List[Dict]], cache_keys: List[Optional[str]]):
+        """
+        Load cached chapters and split the remaining videos' windows into LLM requests
         """
         window_size_seconds = 300  # 5 minutes
         overlap_seconds = 60       # 1 minute
-        
-        windows = self._create_windows(transcript_segments, window_size_seconds, overlap_seconds)
-        chapters = []
-        
-        print(f"Processing {len(windows)} windows for chapter generation...")
-        
-        for i, window in enumerate(windows):
-            max_retries = 3
-            retry_count = 0
-            
-            while retry_count < max_retries:
-                try:
-                    window_text = " ".join([seg['text'] for seg in window['segments']])
-                    start_time = window['start']
-                    end_time = window['end']
-                    
-                    prompt = f"""
-                    Analyze the following video transcript segment (from {start_time}s to {end_time}s) and identify the main topic or chapter.
-                    
-                    Transcript:
-                    {window_text}
-                    
-                    Return a JSON object with the following fields:
+
+        results: List[Optional[List[Dict]]] = [None] * len(transcripts)
+        # (video index, window index, window) for every window that needs the LLM
+        pending = []
+        generated_videos = []
+
+        for video_idx, (segments, cache_key) in enumerate(zip(transcripts, cache_keys)):
+            if cache_key:
+                cached = self._load_cached_chapters(cache_key)
+                if cached is not None:
+                    logger.info("Using cached chapters (%d) for %s", len(cached), cache_key)
+                    results[video_idx] = cached
+                    continue
+
+            windows = self._create_windows(segments, window_size_seconds, overlap_seconds)
+            generated_videos.append(video_idx)
+            for window_idx, window in enumerate(windows):
+                pending.append((video_idx, window_idx, window))
+
+        batches = [pending[i:i + LLM_WINDOWS_PER_REQUEST]
+                   for i in range(0, len(pending), LLM_WINDOWS_PER_REQUEST)]
+        logger.info("Processing %d windows for chapter generation in %d requests", len(pending), len(batches))
+
+        return results, generated_videos, batches
+
+    def _collect_batches(self, results: List[Optional[List[Dict]]], generated_videos: List[int],
+                         batches: List[List[tuple]], generated_batches: List[List[tuple]],
+                         cache_keys: List[Optional[str]]) -> Tuple[List[List[Dict]], List[bool]]:
+        """
+        Scatter per-request chapters back to their videos and cache complete results.
+        Returns the chapters and a completeness flag per video.
+        """
+        # Chapters per video, keyed by window index to keep timeline order
+        chapters_by_video = {video_idx: {} for video_idx in generated_videos}
+        # Only cache results where every window got a real LLM chapter
+        incomplete = set()
+
+        for batch, generated in zip(batches, generated_batches):
+            for (video_idx, window_idx, _), (chapter, is_llm_chapter) in zip(batch, generated):
+                if chapter is not None:
+                    chapters_by_video[video_idx][window_idx] = chapter
+                if not is_llm_chapter:
+                    incomplete.add(video_idx)
+
+        for video_idx, by_window in chapters_by_video.items():
+            chapters = self._refine_chapters([by_window[i] for i in sorted(by_window)])
+            cache_key = cache_keys[video_idx]
+            if cache_key and video_idx not in incomplete and chapters:
+                self._store_cached_chapters(cache_key, chapters)
+            results[video_idx] = chapters
+
+        # Cached videos were only cached when complete
+        return results, [video_idx not in incomplete for video_idx in range(len(results))]
+
+    def _generate_window_batch(self, windows: List[Dict], batch_num: int) -> List[tuple]:
+        """
+        Ask the LLM for one chapter per window in a single request.
+        Returns a (chapter, is_llm_chapter) pair per window. Windows the response
+        doesn't cover are retried one per request; if that fails too, they get a
+        raw transcript fallback chapter that is not marked as an LLM chapter.
+        """
+        window_texts = [" ".join([seg['text'] for seg in window['segments']]) for window in windows]
+        data, quota_exceeded = self._request_chapters(windows, window_texts, batch_num)
+        items = self._match_items(windows, data) if data is not None else [None] * len(windows)
+
+        generated = []
+        for window, window_text, item in zip(windows, window_texts, items):
+            if item is None:
+                if len(windows) > 1 and not quota_exceeded:
+                    # Retry a window the batched response missed in a request of its own
+                    time.sleep(self._reserve_request_slot())
+                    generated.extend(self._generate_window_batch([window], batch_num))
+                else:
+                    generated.append((self._fallback_chapter(window, window_text), False))
+                continue
+            chapter = self._chapter_from_response(item, window, window_text)
+            logger.debug("Generated chapter: %s (%.1fs)", chapter['title'], chapter['end'] - chapter['start'])
+            generated.append((chapter, True))
+        return generated
+
+    def _request_chapters(self, windows: List[Dict], window_texts: List[str], batch_num: int) -> Tuple[Optional[list], bool]:
+        """
+        Send one chapter request for the windows.
+        Returns the parsed JSON array (None on failure) and whether the quota was exceeded.
+        """
+        sections = "\n".join(
+            f"Segment {n} (from {window['start']}s to {window['end']}s):\n{window_text}\n"
+            for n, (window, window_text) in enumerate(zip(windows, window_texts), 1)
+        )
+
+        prompt = f"""
+                    Analyze each of the following {len(windows)} video transcript segments and identify the main topic or chapter of each one.
+
+                    {sections}
+                    Return a JSON array with exactly {len(windows)} objects, one per segment and in the same order, each with the following fields:
                     - title: A concise and descriptive title for this section.
                     - description: A detailed summary of what is discussed in this section.
                     - key_concepts: A list of key concepts or terms mentioned.
-                    - start_time: The specific start time (in seconds) where this topic actually begins within the segment.
-                    - end_time: The specific end time (in seconds) where this topic ends within the segment.
-                    
-                    Only return the JSON object, no other text.
+                    - start_time: The specific start time (in seconds) where this topic actually begins within its segment.
+                    - end_time: The specific end time (in seconds) where this topic ends within its segment.
+
+                    Only return the JSON array, no other text.
                     """
-                    
-                    response = self.model.generate_content(prompt)
-                    
-                    # Parse JSON response
-                    try:
-                        text = response.text.strip()
-                        # Handle potential markdown code blocks
-                        if text.startswith("```json"):
-                            text = text[7:-3]
-                        elif text.startswith("```"):
-                            text = text[3:-3]
-                            
-                        data = json.loads(text)
-                        
-                        # Validate and use LLM provided timestamps if reasonable
-                        chapter_start = data.get('start_time', start_time)
-                        chapter_end = data.get('end_time', end_time)
-                        
-                        # Ensure timestamps are within the window bounds (with some buffer)
-                        if chapter_start < start_time or chapter_start > end_time:
-                            chapter_start = start_time
-                        if chapter_end < start_time or chapter_end > end_time:
-                            chapter_end = end_time
-                            
-                        chapters.append({
-                            'start': chapter_start,
-                            'end': chapter_end,
-                            'title': data.get('title', 'Untitled Chapter'),
-                            'description': data.get('description', ''),
-                            'key_concepts': data.get('key_concepts', []),
-                            'transcript_text': window_text
-                        })
-                        print(f"  Generated chapter: {data.get('title')} ({chapter_end - chapter_start:.1f}s)")
-                        
-                    except json.JSONDecodeError:
-                        print(f"  Failed to parse JSON from LLM response for window {i}")
-                        # Don't retry for JSON errors, likely model output issue
-                        pass
-                        
-                    # Success, break retry loop
+
+        try:
+            response = self.model.generate_content(prompt)
+        except Exception as e:
+            error_str = str(e)
+            if "429" in error_str or "Quota exceeded" in error_str:
+                logger.warning("Quota exceeded for request %d. Using fallback (Raw Transcript).", batch_num)
+                return None, True
+            logger.error("Error generating chapters for request %d: %s", batch_num, e)
+            return None, False
+
+        # Parse JSON response
+        try:
+            text = response.text.strip()
+            # Handle potential markdown code blocks
+            if text.startswith("```json"):
+                text = text[7:-3]
+            elif text.startswith("```"):
+                text = text[3:-3]
+
+            data = json.loads(text)
+        except (json.JSONDecodeError, ValueError):
+            logger.error("Failed to parse JSON from LLM response for request %d", batch_num)
+            return None, False
+
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            logger.error("LLM returned no chapter array for request %d", batch_num)
+            return None, False
+        if len(data) != len(windows):
+            logger.warning("LLM returned %d chapters for %d segments in request %d",
+                           len(data), len(windows), batch_num)
+        return data, False
+
+    @staticmethod
+    def _match_items(windows: List[Dict], data: list) -> List[Optional[Dict]]:
+        """
+        Pair response items with windows. Normally they match one to one; if the
+        count is off, an item is kept for the next window (in order) whose time
+        range contains its start_time, and windows without an item get None.
+        """
+        items = [item if isinstance(item, dict) else None for item in data]
+        if len(items) == len(windows):
+            return items
+
+        matched: List[Optional[Dict]] = [None] * len(windows)
+        next_window = 0
+        for item in items:
+            start = item.get('start_time') if item else None
+            if not isinstance(start, (int, float)):
+                continue
+            for i in range(next_window, len(windows)):
+                if windows[i]['start'] <= start <= windows[i]['end']:
+                    matched[i] = item
+                    next_window = i + 1
                     break
-                    
-                except Exception as e:
-                    error_str = str(e)
-                    if "429" in error_str or "Quota exceeded" in error_str:
-                        print(f"  Quota exceeded for window {i}. Using fallback (Raw Transcript).")
-                        # Fallback: Create a chapter using the raw transcript
-                        # Use first 80 chars of transcript as title
-                        fallback_title = window_text[:80].strip() + "..." if len(window_text) > 80 else window_text
-                        
-                        chapters.append({
-                            'start': start_time,
-                            'end': end_time,
-                            'title': fallback_title,
-                            'description': window_text[:1000], # Use transcript as description
-                            'key_concepts': [],
-                            'transcript_text': window_text
-                        })
-                        break # Stop retrying and move to next window
-                    else:
-                        print(f"  Error generating chapter for window {i}: {e}")
-                        break
-            
-            # Rate limiting between successful requests
-            # Gemini Free Tier is ~15 RPM (1 request every 4 seconds)
-            time.sleep(4)
-                
-        return self._refine_chapters(chapters)
+        return matched
+
+    def _chapter_from_response(self, data: Dict, window: Dict, window_text: str) -> Dict:
+        start_time = window['start']
+        end_time = window['end']
+
+        # Validate and use LLM provided timestamps if reasonable
+        chapter_start = data.get('start_time', start_time)
+        chapter_end = data.get('end_time', end_time)
+
+        # Ensure timestamps are within the window bounds (with some buffer)
+        if not isinstance(chapter_start, (int, float)) or chapter_start < start_time or chapter_start > end_time:
+            chapter_start = start_time
+        if not isinstance(chapter_end, (int, float)) or chapter_end < start_time or chapter_end > end_time:
+            chapter_end = end_time
+
+        return {
+            'start': chapter_start,
+            'end': chapter_end,
+            'title': data.get('title', 'Untitled Chapter'),
+            'description': data.get('description', ''),
+            'key_concepts': data.get('key_concepts', []),
+            'transcript_text': window_text
+        }
+
+    def _fallback_chapter(self, window: Dict, window_text: str) -> Dict:
+        # Fallback: Create a chapter using the raw transcript
+        # Use first 80 chars of transcript as title
+        fallback_title = window_text[:80].strip() + "..." if len(window_text) > 80 else window_text
+
+        return {
+            'start': window['start'],
+            'end': window['end'],
+            'title': fallback_title,
+            'description': window_text[:1000], # Use transcript as description
+            'key_concepts': [],
+            'transcript_text': window_text
+        }
+
+    def _cache_path(self, cache_key: str) -> str:
+        return os.path.join(self.cache_dir, f"{cache_key}.json")
+
+    def _load_cached_chapters(self, cache_key: str) -> Optional[List[Dict]]:
+        try:
+            with open(self._cache_path(cache_key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _store_cached_chapters(self, cache_key: str, chapters: List[Dict]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial file
+            tmp_path = f"{self._cache_path(cache_key)}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(chapters, f)
+            os.replace(tmp_path, self._cache_path(cache_key))
+        except OSError as e:
+            logger.warning("Could not cache chapters: %s", e)
 
     def _create_windows(self, segments: List[Dict], window_size: float, overlap: float) -> List[Dict]:
         windows = []
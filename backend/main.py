@@ -4,11 +4,19 @@ FastAPI backend for video search engine
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 import uvicorn
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import logging.handlers
 import os
+import queue
+import time
+import orjson
 
 try:
     # Try absolute imports (when running from parent directory)
@@ -17,6 +25,8 @@ try:
     from backend.llm_service import LLMService
     from backend.neo4j_service import Neo4jService
     from backend.knowledge_graph_service import KnowledgeGraphService
+    from backend.search_cache import SearchCache
+    from backend.config import UVICORN_WORKERS, SEARCH_CACHE_SIZE, SEARCH_CACHE_THRESHOLD, SEARCH_CACHE_TTL, SERVICE_RETRY_SECONDS, INGEST_GROUP_SIZE
 except ImportError:
     # Fall back to relative imports (when running from backend directory)
     from youtube_scraper import YouTubeScraper
@@ -24,8 +34,12 @@ except ImportError:
     from llm_service import LLMService
     from neo4j_service import Neo4jService
     from knowledge_graph_service import KnowledgeGraphService
+    from search_cache import SearchCache
+    from config import UVICORN_WORKERS, SEARCH_CACHE_SIZE, SEARCH_CACHE_THRESHOLD, SEARCH_CACHE_TTL, SERVICE_RETRY_SECONDS, INGEST_GROUP_SIZE
 
-app = FastAPI(title="NPTEL Video Search Engine")
+app = FastAPI(title="NPTEL Video Search Engine", default_response_class=ORJSONResponse)
+
+logger = logging.getLogger("nptel.main")
 
 # Serve static files from frontend directory
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
@@ -93,6 +107,25 @@ llm_service = None
 neo4j_service = None
 knowledge_graph_service = None
 
+# Results of recent searches (exact and semantically similar queries)
+search_cache = SearchCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_THRESHOLD, SEARCH_CACHE_TTL)
+
+# Marks a service whose initialization failed, so later requests fail fast
+# instead of retrying a slow connect; retried after SERVICE_RETRY_SECONDS
+_FAILED = object()
+# Service name -> (error message, time.monotonic() of the failure)
+_service_errors = {}
+
+def _raise_failed(name: str):
+    raise HTTPException(status_code=500, detail=_service_errors[name][0])
+
+def _mark_failed(name: str, detail: str):
+    _service_errors[name] = (detail, time.monotonic())
+    _raise_failed(name)
+
+def _failed_recently(name: str) -> bool:
+    return time.monotonic() - _service_errors[name][1] < SERVICE_RETRY_SECONDS
+
 def get_youtube_scraper():
     global youtube_scraper
     if youtube_scraper is None:
@@ -107,53 +140,222 @@ def get_embedding_service():
 
 def get_llm_service():
     global llm_service
+    if llm_service is _FAILED:
+        if _failed_recently("llm"):
+            _raise_failed("llm")
+        llm_service = None
     if llm_service is None:
         try:
             llm_service = LLMService()
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"LLM service initialization failed: {str(e)}")
+            llm_service = _FAILED
+            _mark_failed("llm", f"LLM service initialization failed: {str(e)}")
     return llm_service
 
 def get_neo4j_service():
     global neo4j_service
+    if neo4j_service is _FAILED:
+        if _failed_recently("neo4j"):
+            _raise_failed("neo4j")
+        neo4j_service = None
     if neo4j_service is None:
         try:
             neo4j_service = Neo4jService()
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Neo4j initialization failed: {str(e)}")
+            neo4j_service = _FAILED
+            _mark_failed("neo4j", f"Neo4j initialization failed: {str(e)}")
     return neo4j_service
 
 def get_knowledge_graph_service():
     global knowledge_graph_service
+    if knowledge_graph_service is _FAILED:
+        if _failed_recently("knowledge_graph"):
+            _raise_failed("knowledge_graph")
+        knowledge_graph_service = None
     if knowledge_graph_service is None:
+        # A failed Neo4j connection is reported as-is and not cached here;
+        # get_neo4j_service retries it on its own schedule
+        neo4j = get_neo4j_service()
         try:
-            neo4j = get_neo4j_service()
             knowledge_graph_service = KnowledgeGraphService(neo4j.driver)
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Knowledge graph service initialization failed: {str(e)}")
+            knowledge_graph_service = _FAILED
+            _mark_failed("knowledge_graph", f"Knowledge graph service initialization failed: {str(e)}")
     return knowledge_graph_service
 
 
+# Writes log records on a background thread, so logging never blocks a request on I/O
+log_listener = None
+
+
+@app.on_event("startup")
+def setup_logging():
+    global log_listener
+    if log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    app_logger = logging.getLogger("nptel")
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.propagate = False
+    log_listener.start()
+
+
+@app.on_event("startup")
+def warm_up_services():
+    """
+    Load models and open Neo4j connections before the first request (once per worker)
+    """
+    global neo4j_service, knowledge_graph_service
+    try:
+        emb_service = get_embedding_service()
+        emb_service.create_embedding_single("warmup")
+        emb_service.create_embeddings(["warmup"])
+    except Exception as e:
+        logger.warning("Embedding service warmup failed: %s", e)
+
+    try:
+        neo4j = get_neo4j_service()
+        with neo4j.driver.session() as session:
+            session.run("RETURN 1").consume()
+        get_knowledge_graph_service()
+    except HTTPException as e:
+        logger.warning("%s", e.detail)
+        # Don't keep a startup failure (e.g. Neo4j still coming up); the first request retries
+        if neo4j_service is _FAILED:
+            neo4j_service = None
+            _service_errors.pop("neo4j", None)
+        if knowledge_graph_service is _FAILED:
+            knowledge_graph_service = None
+            _service_errors.pop("knowledge_graph", None)
+    except Exception as e:
+        logger.warning("Neo4j warmup failed: %s", e)
+
+
+@app.on_event("shutdown")
+def close_services():
+    # KnowledgeGraphService shares the Neo4j driver, so closing it once is enough
+    if neo4j_service is not None and neo4j_service is not _FAILED:
+        neo4j_service.close()
+    if youtube_scraper is not None:
+        youtube_scraper.close()
+    if log_listener is not None:
+        log_listener.stop()
+
+
 # Request/Response models
 class SearchQuery(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
     query: str
     top_k: int = 5
 
 
 class PlaylistRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
     playlist_url: str
 
 
+class ChapterHit(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    video_title: Optional[str] = None
+    video_url: Optional[str] = None
+    chapter_title: Optional[str] = None
+    chapter_description: Optional[str] = None
+    start: float
+    end: float
+    score: float
+
+
 class SearchResponse(BaseModel):
-    results: List[dict]
+    model_config = ConfigDict(validate_assignment=False)
+
+    results: List[ChapterHit]
     query: str
 
 
+def transcript_hash(transcript: List[dict]) -> str:
+    """Content hash of a transcript, used to skip re-processing unchanged videos"""
+    text = "\n".join(seg['text'] for seg in transcript)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
 @app.get("/api")
 async def api_root():
     return {"message": "NPTEL Video Search Engine API (Neo4j + LLM Edition)"}
 
 
+def sse_event(data: dict, event: Optional[str] = None) -> bytes:
+    """Encode one Server-Sent Event"""
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def filter_unchanged_videos(neo4j, videos: List[dict]):
+    """
+    Split videos into those needing processing and those whose transcript
+    is already stored unchanged
+    """
+    for video in videos:
+        video["transcript_hash"] = transcript_hash(video["transcript"])
+    existing_hashes = neo4j.get_existing_hashes([v["video_id"] for v in videos])
+
+    videos_to_process = []
+    unchanged_videos = []
+    for video in videos:
+        if existing_hashes.get(video["video_id"]) == video["transcript_hash"]:
+            logger.info("Skipping %s - Already processed", video["title"])
+            unchanged_videos.append(video)
+        else:
+            videos_to_process.append(video)
+    return videos_to_process, unchanged_videos
+
+
+def forget_incomplete_hashes(videos: List[dict], complete_per_video: List[bool]):
+    """
+    Store no transcript hash for videos with fallback or missing chapters,
+    so the next ingest doesn't skip them as unchanged and retries the LLM
+    """
+    for video, complete in zip(videos, complete_per_video):
+        if not complete:
+            video["transcript_hash"] = None
+
+
+def embed_chapters(emb_service, videos: List[dict], chapters_per_video: List[List[dict]]):
+    """
+    Create embeddings for all chapters of the playlist in one encoder call (Title + Description).
+    Returns the (video, chapters) pairs that have chapters and one embedding array per pair.
+    """
+    videos_with_chapters = []
+    texts_to_embed = []
+    for video, chapters in zip(videos, chapters_per_video):
+        if not chapters:
+            logger.info("Skipping %s - No chapters generated", video["title"])
+            continue
+        videos_with_chapters.append((video, chapters))
+        texts_to_embed.extend(f'{c["title"]}: {c["description"]}' for c in chapters)
+
+    if not texts_to_embed:
+        return [], []
+
+    # Chapters of re-processed videos often have identical text, reuse their embeddings
+    embeddings = emb_service.create_embeddings_cached(texts_to_embed)
+
+    embeddings_list = []
+    offset = 0
+    for _, chapters in videos_with_chapters:
+        end = offset + len(chapters)
+        embeddings_list.append(embeddings[offset:end])
+        offset = end
+    return videos_with_chapters, embeddings_list
+
+
 @app.post("/api/process-playlist")
 async def process_playlist(request: PlaylistRequest):
     """
@@ -171,68 +373,227 @@ async def process_playlist(request: PlaylistRequest):
         
         # Get videos with transcripts
         try:
-            videos = scraper.get_playlist_with_transcripts(request.playlist_url)
+            videos = await scraper.get_playlist_with_transcripts_async(request.playlist_url)
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
         
         if not videos:
             raise HTTPException(status_code=404, detail="No videos with transcripts found.")
         
-        processed_count = 0
-        
-        for video in videos:
-            print(f'Skipping {video["title"]} - No chapters generated')
+        # Skip videos whose transcript is already stored unchanged
+        # (blocking calls run in worker threads so other requests aren't held up)
+        videos_to_process, unchanged_videos = await asyncio.to_thread(filter_unchanged_videos, neo4j, videos)
+
+        # Generate chapters using LLM (windows of several videos share a request,
+        # and requests run concurrently)
+        chapters_per_video, complete_per_video = await llm.generate_chapters_batch_async(
+            [video["transcript"] for video in videos_to_process],
+            [f'{video["video_id"]}_{video["transcript_hash"]}' for video in videos_to_process]
+        )
+        forget_incomplete_hashes(videos_to_process, complete_per_video)
+
+        videos_with_chapters, embeddings_list = await asyncio.to_thread(
+            embed_chapters, emb_service, videos_to_process, chapters_per_video
+        )
+
+        # Store in Neo4j (one session and transaction for the whole playlist)
+        if videos_with_chapters:
+            await asyncio.to_thread(
+                neo4j.add_videos_with_chapters_bulk,
+                [video for video, _ in videos_with_chapters],
+                [chapters for _, chapters in videos_with_chapters],
+                embeddings_list
+            )
+            # New chapters can change any search result
+            search_cache.clear()
 
-            
-            # Generate chapters using LLM
-            chapters = llm.generate_chapters(video["transcript"], video["duration"])
-            
-            if not chapters:
-                print(f'Skipping {video["title"]} - No chapters generated')
-                continue
-                
-            # Create embeddings for chapters (Title + Description)
-            texts_to_embed = [f'{c["title"]}: {c["description"]}' for c in chapters]
-            embeddings = emb_service.create_embeddings(texts_to_embed)
-            
-            # Store in Neo4j
-            neo4j.add_video_with_chapters(video, chapters, embeddings.tolist())
-            processed_count += 1
-            
         return {
             "message": "Playlist processed successfully",
-            "videos_processed": processed_count,
+            "videos_processed": len(videos_with_chapters),
+            "videos_unchanged": len(unchanged_videos),
             "total_videos": len(videos)
         }
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing playlist")
         raise HTTPException(status_code=500, detail=f"Error processing playlist: {str(e)}")
 
 
+@app.post("/api/process-playlist/stream")
+async def process_playlist_stream(request: PlaylistRequest):
+    """
+    Process a YouTube playlist like /api/process-playlist, but report progress
+    as Server-Sent Events and store each video as soon as its chapters are embedded.
+    Videos go to chapter generation in groups of INGEST_GROUP_SIZE as their
+    transcripts arrive, so LLM and embedding work overlaps the remaining downloads.
+    Ends with a "complete" status event, or an "error" event.
+    """
+    scraper = get_youtube_scraper()
+    emb_service = get_embedding_service()
+    llm = get_llm_service()
+    neo4j = get_neo4j_service()
+
+    async def process_group(group: List[dict], events: asyncio.Queue, counts: dict):
+        """
+        Chapter, embed and store one group of downloaded videos, reporting to events
+        """
+        # One batched hash lookup per group
+        videos_to_process, unchanged_videos = await asyncio.to_thread(filter_unchanged_videos, neo4j, group)
+        counts["unchanged"] += len(unchanged_videos)
+        for video in unchanged_videos:
+            events.put_nowait(sse_event({"video_id": video["video_id"], "title": video["title"], "status": "unchanged"}))
+        if not videos_to_process:
+            return
+
+        chapters_per_video, complete_per_video = await llm.generate_chapters_batch_async(
+            [video["transcript"] for video in videos_to_process],
+            [f'{video["video_id"]}_{video["transcript_hash"]}' for video in videos_to_process]
+        )
+        forget_incomplete_hashes(videos_to_process, complete_per_video)
+        for video, chapters in zip(videos_to_process, chapters_per_video):
+            if not chapters:
+                events.put_nowait(sse_event({"video_id": video["video_id"], "title": video["title"], "status": "skipped"}))
+
+        videos_with_chapters, embeddings_list = await asyncio.to_thread(
+            embed_chapters, emb_service, videos_to_process, chapters_per_video
+        )
+
+        for (video, chapters), embeddings in zip(videos_with_chapters, embeddings_list):
+            await asyncio.to_thread(neo4j.add_video_with_chapters, video, chapters, embeddings)
+            # New chapters can change any search result
+            search_cache.clear()
+            counts["processed"] += 1
+            events.put_nowait(sse_event({"video_id": video["video_id"], "title": video["title"],
+                                         "chapters": len(chapters), "status": "done"}))
+
+    async def run_pipeline(events: asyncio.Queue):
+        """
+        Download transcripts and process them group by group; groups run one at a time
+        in a background task while later transcripts keep downloading
+        """
+        groups = asyncio.Queue()
+        counts = {"processed": 0, "unchanged": 0}
+
+        async def process_groups():
+            while (group := await groups.get()) is not None:
+                await process_group(group, events, counts)
+
+        consumer = asyncio.create_task(process_groups())
+        transcripts = scraper.iter_playlist_with_transcripts(request.playlist_url)
+        try:
+            total_videos = 0
+            group = []
+            async for video in transcripts:
+                total_videos += 1
+                group.append(video)
+                events.put_nowait(sse_event({"video_id": video["video_id"], "title": video["title"],
+                                             "status": "transcript"}))
+                if len(group) >= INGEST_GROUP_SIZE:
+                    groups.put_nowait(group)
+                    group = []
+                if consumer.done():
+                    # Surface a processing error without waiting for the downloads
+                    break
+            if group:
+                groups.put_nowait(group)
+            groups.put_nowait(None)
+
+            if not total_videos:
+                events.put_nowait(sse_event({"detail": "No videos with transcripts found."}, event="error"))
+                return
+            if not consumer.done():
+                events.put_nowait(sse_event({"status": "transcripts", "total_videos": total_videos}))
+            await consumer
+
+            events.put_nowait(sse_event({
+                "status": "complete",
+                "videos_processed": counts["processed"],
+                "videos_unchanged": counts["unchanged"],
+                "total_videos": total_videos
+            }))
+        finally:
+            consumer.cancel()
+            # Cancels fetches still queued when we stopped early
+            await transcripts.aclose()
+
+    async def event_stream():
+        events = asyncio.Queue()
+        pipeline = asyncio.create_task(run_pipeline(events))
+        # Wake the loop below once the pipeline is finished, whatever the outcome
+        pipeline.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            await pipeline
+        except Exception as e:
+            logger.exception("Error processing playlist")
+            yield sse_event({"detail": f"Error processing playlist: {str(e)}"}, event="error")
+        finally:
+            # The client may disconnect early; stop downloading and processing
+            pipeline.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/api/search", response_model=SearchResponse)
 async def search_videos(query: SearchQuery):
     """
     Search for video chapters matching the query
     """
     try:
+        results = search_cache.get_exact(query.query, query.top_k)
+        if results is not None:
+            return SearchResponse.model_construct(results=results, query=query.query)
+
         emb_service = get_embedding_service()
         neo4j = get_neo4j_service()
         
         # Create query embedding
-        query_embedding = emb_service.create_embeddings([query.query])[0]
-        
-        # Search in Neo4j
-        results = neo4j.hybrid_search(query.query, query_embedding.tolist(), query.top_k)
+        query_embedding = emb_service.create_embedding_single(query.query)
+
+        # Reuse results of a near-identical earlier query
+        results = search_cache.get_similar(query_embedding, query.top_k)
+        if results is None:
+            # Search in Neo4j
+            # Rows come straight from our own query, so skip validation when building hits
+            results = [ChapterHit.model_construct(**row)
+                       for row in neo4j.hybrid_search(query.query, query_embedding, query.top_k)]
+            search_cache.put(query.query, query.top_k, query_embedding, results)
         
-        return SearchResponse(results=results, query=query.query)
+        return SearchResponse.model_construct(results=results, query=query.query)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/search/stream")
+async def search_videos_stream(query: SearchQuery):
+    """
+    Search for video chapters, streaming each result as a Server-Sent Event
+    as soon as Neo4j returns it. Ends with an "end" event.
+    """
+    try:
+        emb_service = get_embedding_service()
+        neo4j = get_neo4j_service()
+
+        # Create query embedding up front so failures still return a plain error
+        query_embedding = emb_service.create_embedding_single(query.query)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    def event_stream():
+        try:
+            for row in neo4j.iter_hybrid_search(query.query, query_embedding, query.top_k):
+                yield sse_event(row)
+        except Exception as e:
+            yield sse_event({"detail": str(e)}, event="error")
+        yield sse_event({}, event="end")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.get("/api/related/{video_id}")
 async def get_related(video_id: str):
     """
@@ -265,8 +626,7 @@ async def build_knowledge_graph(similarity_threshold: float = 0.7, max_connectio
             "statistics": stats
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Knowledge graph request failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -284,8 +644,7 @@ async def get_knowledge_graph(video_id: Optional[str] = None, limit: int = 500,
         graph_data = kg_service.get_knowledge_graph(video_id, limit, auto_build)
         return graph_data
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Knowledge graph request failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -305,8 +664,7 @@ async def get_learning_path(target_chapter_id: str, start_chapter_id: Optional[s
             "path": path
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Knowledge graph request failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -338,5 +696,13 @@ async def get_all_videos():
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
+    # Import string so uvicorn can spawn workers; each worker lazily loads its own services.
+    # Run from the repository root (python -m backend.main) so the backend package is importable
+    uvicorn.run(
+        "backend.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=UVICORN_WORKERS,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+    )
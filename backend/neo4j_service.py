@@ -1,7 +1,9 @@
 
 from neo4j import GraphDatabase
+import numpy as np
+import hashlib
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 
 class Neo4jService:
     def __init__(self):
@@ -9,7 +11,17 @@ class Neo4jService:
         user = os.getenv("NEO4J_USER", "neo4j")
         password = os.getenv("NEO4J_PASSWORD", "password")
 
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        # Keep warm connections around for concurrent requests
+        self.driver = GraphDatabase.driver(
+            uri, auth=(user, password),
+            max_connection_pool_size=int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+            connection_acquisition_timeout=30,
+            max_connection_lifetime=3600,
+            connection_timeout=5,
+            keep_alive=True
+        )
+        # Fail fast on bad credentials and pay routing discovery here, not on first search
+        self.driver.verify_connectivity()
         self._create_constraints_and_indexes()
 
     def close(self):
@@ -19,6 +31,9 @@ class Neo4jService:
         with self.driver.session() as session:
             # Constraint for Video ID
             session.run("CREATE CONSTRAINT video_id_unique IF NOT EXISTS FOR (v:Video) REQUIRE v.id IS UNIQUE")
+
+            # Constraint for Chapter ID (also indexes the MERGE lookup on re-ingest)
+            session.run("CREATE CONSTRAINT chapter_id_unique IF NOT EXISTS FOR (c:Chapter) REQUIRE c.id IS UNIQUE")
             
             # Vector Index for Chapter embeddings
             # Note: Syntax depends on Neo4j version. Assuming 5.x
@@ -45,81 +60,177 @@ class Neo4jService:
             except Exception as e:
                 print(f"Warning creating fulltext index: {e}")
 
-    def add_video_with_chapters(self, video_data: Dict, chapters: List[Dict], embeddings: List[List[float]]):
+    def add_video_with_chapters(self, video_data: Dict, chapters: List[Dict], embeddings: np.ndarray):
         with self.driver.session() as session:
             session.execute_write(self._create_video_graph, video_data, chapters, embeddings)
 
+    def add_videos_with_chapters_bulk(self, videos: List[Dict], chapters_list: List[List[Dict]],
+                                      embeddings_list: List[np.ndarray]):
+        """
+        Write several videos and all their chapters in a single transaction
+        """
+        params = [
+            self._video_params(video_data, chapters, embeddings)
+            for video_data, chapters, embeddings in zip(videos, chapters_list, embeddings_list)
+        ]
+        with self.driver.session() as session:
+            session.execute_write(self._create_videos_graph, params)
+
+    def _video_params(self, video_data: Dict, chapters: List[Dict], embeddings: np.ndarray) -> Dict:
+        video_id = video_data['video_id']
+        return {
+            'video_id': video_id,
+            'title': video_data['title'],
+            'url': video_data['url'],
+            # None (stored as NULL) when chapters are incomplete, so the next ingest retries the video
+            'transcript_hash': video_data.get('transcript_hash'),
+            'chapters': [
+                {
+                    'id': self._chapter_id(video_id, chapter),
+                    'title': chapter['title'],
+                    'description': chapter['description'],
+                    'start': chapter['start'],
+                    'end': chapter['end'],
+                    'transcript': chapter.get('transcript_text', ''),
+                    # Convert one row at a time instead of the whole matrix up front
+                    'embedding': embeddings[i].tolist()
+                }
+                for i, chapter in enumerate(chapters)
+            ]
+        }
+
+    @staticmethod
+    def _chapter_id(video_id: str, chapter: Dict) -> str:
+        """
+        Stable chapter id, so re-ingesting an unchanged chapter matches the stored node.
+        The description is included because the embedding is computed from title + description.
+        """
+        key = f"{video_id}|{chapter['start']}|{chapter['title']}|{chapter['description']}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
     def _create_video_graph(self, tx, video_data, chapters, embeddings):
-        # Create Video Node
+        self._create_videos_graph(tx, [self._video_params(video_data, chapters, embeddings)])
+
+    def _create_videos_graph(self, tx, videos):
+        # Remove chapters of these videos that are not part of the new chapter set
         tx.run("""
-        MERGE (v:Video {id: $video_id})
-        SET v.title = $title, v.url = $url
-        """, video_id=video_data['video_id'], title=video_data['title'], url=video_data['url'])
-
-        # Create Chapters and connect to Video
-        for i, chapter in enumerate(chapters):
-            embedding = embeddings[i]
-            tx.run("""
-            MATCH (v:Video {id: $video_id})
-            CREATE (c:Chapter {
-                title: $title,
-                description: $description,
-                start_time: $start,
-                end_time: $end,
-                transcript: $transcript,
-                embedding: $embedding
-            })
-            CREATE (v)-[:HAS_CHAPTER]->(c)
-            """, 
-            video_id=video_data['video_id'],
-            title=chapter['title'],
-            description=chapter['description'],
-            start=chapter['start'],
-            end=chapter['end'],
-            transcript=chapter.get('transcript_text', ''),
-            embedding=embedding
-            )
-
-    def hybrid_search(self, query_text: str, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
+        UNWIND $videos AS video
+        MATCH (:Video {id: video.video_id})-[:HAS_CHAPTER]->(old:Chapter)
+        WHERE old.id IS NULL OR NOT old.id IN [c IN video.chapters | c.id]
+        DETACH DELETE old
+        """, videos=videos)
+
+        # Create Video nodes and their Chapters in one statement (one round-trip).
+        # Chapters that already exist are matched and keep their embedding, so it is not re-indexed.
+        tx.run("""
+        UNWIND $videos AS video
+        MERGE (v:Video {id: video.video_id})
+        SET v.title = video.title, v.url = video.url, v.transcript_hash = video.transcript_hash
+        WITH v, video
+        UNWIND video.chapters AS c
+        MERGE (ch:Chapter {id: c.id})
+        ON CREATE SET ch.embedding = c.embedding
+        SET ch.title = c.title,
+            ch.description = c.description,
+            ch.start_time = c.start,
+            ch.end_time = c.end,
+            ch.transcript = c.transcript
+        MERGE (v)-[:HAS_CHAPTER]->(ch)
+        """, videos=videos)
+
+    def get_existing_hashes(self, video_ids: List[str]) -> Dict[str, str]:
+        """
+        Return video_id -> transcript_hash for the given videos that are already stored
+        """
+        with self.driver.session() as session:
+            result = session.run("""
+            MATCH (v:Video)
+            WHERE v.id IN $video_ids AND v.transcript_hash IS NOT NULL
+            RETURN v.id as id, v.transcript_hash as transcript_hash
+            """, video_ids=video_ids)
+
+            return {r['id']: r['transcript_hash'] for r in result}
+
+    def hybrid_search(self, query_text: str, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict]:
+        return list(self.iter_hybrid_search(query_text, query_embedding, top_k))
+
+    def iter_hybrid_search(self, query_text: str, query_embedding: np.ndarray, top_k: int = 5) -> Iterator[Dict]:
+        """
+        Same as hybrid_search, but yields each result as soon as Neo4j streams it
+        """
+        # The driver needs a plain list; convert only here, right before sending
+        if isinstance(query_embedding, np.ndarray):
+            query_embedding = query_embedding.tolist()
+
+        # Fetch a few more candidates than needed from each index, then rank client-side
+        candidate_k = top_k * 3
+
         with self.driver.session() as session:
             # Hybrid Search: Combine Vector Search and Fulltext Search
-            # We use a subquery to perform both searches and then aggregate results
-            results = session.run("""
-            CALL {
-                CALL db.index.vector.queryNodes('chapter_embeddings', $k, $embedding)
-                YIELD node, score
-                RETURN node, score as vectorScore, 0.0 as textScore
-                UNION
-                CALL db.index.fulltext.queryNodes('chapter_fulltext', $query_text)
-                YIELD node, score
-                RETURN node, 0.0 as vectorScore, score as textScore
-            }
-            WITH node, max(vectorScore) as vectorScore, max(textScore) as textScore
-            // Normalize text score to [0, 1] range using x/(x+1)
-            WITH node, vectorScore, textScore, (textScore / (textScore + 1.0)) as normalizedTextScore
-            // Weighted sum: 80% Vector (Semantic), 20% Text (Keyword)
-            WITH node, vectorScore, textScore, (vectorScore * 0.8) + (normalizedTextScore * 0.2) as finalScore
-            ORDER BY finalScore DESC
+            vector_hits = session.run("""
+            CALL db.index.vector.queryNodes('chapter_embeddings', $k, $embedding)
+            YIELD node, score
+            RETURN elementId(node) as id, score
+            """, k=candidate_k, embedding=query_embedding).values()
+
+            text_hits = session.run("""
+            CALL db.index.fulltext.queryNodes('chapter_fulltext', $query_text)
+            YIELD node, score
+            RETURN elementId(node) as id, score
             LIMIT $k
+            """, k=candidate_k, query_text=query_text).values()
+
+            ids, scores = self._fuse_scores(vector_hits, text_hits, top_k)
+            if not ids:
+                return
+
+            # Fetch only the winning chapters, in rank order.
+            # The context buffer (to center the relevant part) is applied in the query.
+            results = session.run("""
+            UNWIND range(0, size($ids) - 1) AS i
+            MATCH (node:Chapter) WHERE elementId(node) = $ids[i]
             MATCH (v:Video)-[:HAS_CHAPTER]->(node)
             RETURN v.title as video_title, v.url as video_url, 
                    node.title as chapter_title, node.description as chapter_description,
-                   node.start_time as start, node.end_time as end,
-                   finalScore as score
-            """, k=top_k, embedding=query_embedding, query_text=query_text)
-            
-            # Add context buffer to center the relevant part
-            buffer_seconds = 30
-            processed_results = []
-            
+                   CASE WHEN node.start_time - $buffer < 0 THEN 0.0
+                        ELSE toFloat(node.start_time - $buffer) END as start,
+                   toFloat(node.end_time + $buffer) as end,
+                   $scores[i] as score
+            ORDER BY i
+            """, ids=ids, scores=scores, buffer=30)
+
+            # Iterate the result (not result.values()) so rows stream as they arrive
             for record in results:
-                data = record.data()
-                # Add buffer to start and end times
-                data['start'] = max(0, data['start'] - buffer_seconds)
-                data['end'] = data['end'] + buffer_seconds
-                processed_results.append(data)
-                
-            return processed_results
+                yield record.data()
+
+    @staticmethod
+    def _fuse_scores(vector_hits: List[List], text_hits: List[List], top_k: int):
+        """
+        Combine vector and fulltext scores per chapter and return the top_k ids and scores
+        """
+        ids = list(dict.fromkeys([hit[0] for hit in vector_hits] + [hit[0] for hit in text_hits]))
+        if not ids or top_k <= 0:
+            return [], []
+        position = {chapter_id: i for i, chapter_id in enumerate(ids)}
+
+        vector_scores = np.zeros(len(ids))
+        text_scores = np.zeros(len(ids))
+        if vector_hits:
+            vector_scores[[position[hit[0]] for hit in vector_hits]] = [hit[1] for hit in vector_hits]
+        if text_hits:
+            text_scores[[position[hit[0]] for hit in text_hits]] = [hit[1] for hit in text_hits]
+
+        # Normalize text score to [0, 1] range using x/(x+1)
+        normalized_text_scores = text_scores / (text_scores + 1.0)
+        # Weighted sum: 80% Vector (Semantic), 20% Text (Keyword)
+        final_scores = vector_scores * 0.8 + normalized_text_scores * 0.2
+
+        top = np.arange(len(ids))
+        if len(ids) > top_k:
+            top = np.argpartition(-final_scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-final_scores[top], kind='stable')]
+
+        return [ids[i] for i in top], final_scores[top].tolist()
 
     def get_related_videos(self, video_id: str) -> List[Dict]:
         """
@@ -1,10 +1,24 @@
 """
 Pinecone service for vector storage and retrieval
 """
-from pinecone import Pinecone, ServerlessSpec
-from backend.config import PINECONE_API_KEY, PINECONE_INDEX_NAME, PINECONE_ENVIRONMENT
-from typing import List, Dict, Optional
-import uuid
+from backend.config import (
+    PINECONE_API_KEY, PINECONE_INDEX_NAME, PINECONE_ENVIRONMENT, PINECONE_POOL_THREADS, PINECONE_BATCH_SIZE
+)
+from typing import Iterable, Iterator, List, Dict, Optional
+from collections import deque
+from itertools import islice
+import numpy as np
+import hashlib
+import time
+
+
+def batched(iterable: Iterable, batch_size: int) -> Iterator[tuple]:
+    """Split an iterable into tuples of at most batch_size items"""
+    it = iter(iterable)
+    batch = tuple(islice(it, batch_size))
+    while batch:
+        yield batch
+        batch = tuple(islice(it, batch_size))
 
 
 class PineconeService:
@@ -12,6 +26,9 @@ class PineconeService:
         if not PINECONE_API_KEY:
             raise ValueError("PINECONE_API_KEY not set in environment variables")
         
+        # Imported here so loading this module doesn't pull in the Pinecone SDK
+        from pinecone import Pinecone
+
         self.pc = Pinecone(api_key=PINECONE_API_KEY)
         self.index_name = PINECONE_INDEX_NAME
         self._ensure_index_exists()
@@ -23,12 +40,15 @@ class PineconeService:
         existing_indexes = [index.name for index in self.pc.list_indexes()]
         
         if self.index_name not in existing_indexes:
+            from pinecone import ServerlessSpec
+
             print(f"Creating Pinecone index: {self.index_name}")
             try:
                 self.pc.create_index(
                     name=self.index_name,
                     dimension=384,  # Dimension for all-MiniLM-L6-v2 model
-                    metric='cosine',
+                    # Vectors are L2-normalized before upsert/query, so dot product == cosine
+                    metric='dotproduct',
                     spec=ServerlessSpec(
                         cloud='aws',
                         region=PINECONE_ENVIRONMENT
@@ -41,48 +61,104 @@ class PineconeService:
         else:
             print(f"Index {self.index_name} already exists")
         
-        self.index = self.pc.Index(self.index_name)
+        # pool_threads lets upserts run concurrently with async_req=True
+        self.index = self.pc.Index(self.index_name, pool_threads=PINECONE_POOL_THREADS)
         print(f"Connected to index: {self.index_name}")
 
-    def upsert_embeddings(self, chunks: List[Dict], embeddings: List[List[float]]):
+    def upsert_embeddings(self, chunks: Iterable[Dict], embeddings: Iterable[np.ndarray]):
         """
         Store embeddings in Pinecone with metadata
-        Note: Pinecone metadata values must be str, int, float, or bool
+        Note: Pinecone metadata values must be str, int, float, or bool.
+        Chunks come from EmbeddingService.prepare_transcript_for_embedding, so
+        video_id, video_url and text are already str (video_title may be None).
+        Chunks and embeddings are consumed lazily, one batch at a time, and at most
+        PINECONE_POOL_THREADS batches are in flight, so memory stays bounded.
+        A video's previously stored vectors are deleted before its first batch,
+        so re-ingesting it leaves no stale chunks behind.
         """
-        vectors = []
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            vector_id = str(uuid.uuid4())
-            # Truncate text if too long (Pinecone has metadata size limits)
-            text = chunk['text'][:1000] if len(chunk['text']) > 1000 else chunk['text']
-            metadata = {
-                'text': text,
-                'start': float(chunk['start']),  # Ensure float type
-                'end': float(chunk['end']),  # Ensure float type
-                'video_id': str(chunk['video_id']),
-                'video_title': str(chunk['video_title'])[:500],  # Limit title length
-                'video_url': str(chunk['video_url']),
-            }
-            vectors.append({
-                'id': vector_id,
-                'values': embedding,
-                'metadata': metadata
-            })
-        
-        # Upsert in batches
-        batch_size = 100
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i:i + batch_size]
-            self.index.upsert(vectors=batch)
-            print(f"Upserted batch {i // batch_size + 1}/{(len(vectors) + batch_size - 1) // batch_size}")
+        pending = deque()
+        total = 0
+        seen_videos = set()
+
+        for batch_num, batch in enumerate(batched(zip(chunks, embeddings), PINECONE_BATCH_SIZE), 1):
+            for chunk, _ in batch:
+                if chunk['video_id'] not in seen_videos:
+                    seen_videos.add(chunk['video_id'])
+                    self.delete_video_vectors(chunk['video_id'])
+
+            vectors = self._build_vectors(batch)
+            # Upsert runs on the index's thread pool; don't wait for it here
+            pending.append((batch_num, vectors, self.index.upsert(vectors=vectors, async_req=True)))
+            total += len(vectors)
+
+            if len(pending) >= PINECONE_POOL_THREADS:
+                self._wait_for_upsert(*pending.popleft())
+
+        while pending:
+            self._wait_for_upsert(*pending.popleft())
         
-        print(f"Successfully upserted {len(vectors)} vectors")
+        print(f"Successfully upserted {total} vectors")
+
+    def _build_vectors(self, batch: tuple) -> List[Dict]:
+        # Normalize once here so the index can use plain dot products
+        embeddings = np.asarray([embedding for _, embedding in batch], dtype=np.float32)
+        embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
 
-    def search(self, query_embedding: List[float], top_k: int = 5, filter_dict: Optional[Dict] = None) -> List[Dict]:
+        return [
+            {
+                # Content-addressed id; the text keeps chunks that share a start time apart
+                'id': hashlib.blake2b(f"{chunk['video_id']}|{chunk['start']}|{chunk['text']}".encode('utf-8'),
+                                      digest_size=12).hexdigest(),
+                'values': embedding.tolist(),
+                'metadata': {
+                    # Truncate text if too long (Pinecone has metadata size limits)
+                    'text': chunk['text'][:1000],
+                    'start': float(chunk['start']),  # Ensure float type
+                    'end': float(chunk['end']),  # Ensure float type
+                    'video_id': chunk['video_id'],
+                    'video_title': (chunk['video_title'] or '')[:500],  # Limit title length
+                    'video_url': chunk['video_url'],
+                }
+            }
+            for (chunk, _), embedding in zip(batch, embeddings)
+        ]
+
+    def delete_video_vectors(self, video_id: str):
+        """
+        Delete all stored vectors of a video
+        """
+        self.index.delete(filter={'video_id': {'$eq': video_id}})
+
+    def _wait_for_upsert(self, batch_num: int, vectors: List[Dict], async_result):
+        try:
+            async_result.get()
+        except Exception as e:
+            print(f"Batch {batch_num} failed ({e}), retrying")
+            self._upsert_with_retry(vectors)
+        print(f"Upserted batch {batch_num}")
+
+    def _upsert_with_retry(self, batch: List[Dict], retries: int = 3):
+        """
+        Upsert one batch synchronously, backing off exponentially on errors (e.g. rate limits)
+        """
+        for attempt in range(retries):
+            try:
+                self.index.upsert(vectors=batch)
+                return
+            except Exception:
+                if attempt == retries - 1:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 5, filter_dict: Optional[Dict] = None) -> List[Dict]:
         """
         Search for similar vectors in Pinecone
         """
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        query_embedding = query_embedding / max(float(np.linalg.norm(query_embedding)), 1e-12)
+
         query_response = self.index.query(
-            vector=query_embedding,
+            vector=query_embedding.tolist(),
             top_k=top_k,
             include_metadata=True,
             filter=filter_dict
@@ -2,26 +2,46 @@
 RAG service for query processing and retrieval
 """
 from backend.embedding_service import EmbeddingService
-from backend.pinecone_service import PineconeService
+from backend.search_cache import SearchCache
+from backend.config import RAG_CACHE_THRESHOLD, RAG_CACHE_TTL
 from typing import List, Dict
-import numpy as np
+from functools import lru_cache
 
 
 class RAGService:
     def __init__(self):
+        # Imported here so importing this module doesn't load the Pinecone SDK
+        from backend.pinecone_service import PineconeService
+
         self.embedding_service = EmbeddingService()
         self.pinecone_service = PineconeService()
+        # Repeated query text skips the embedding forward pass (~1.5 KB per entry)
+        self._embed_query = lru_cache(maxsize=2048)(self.embedding_service.create_embedding_single)
+        # Repeated queries (same text and top_k) skip the embedding and Pinecone round trip,
+        # paraphrases (similar embedding) skip the Pinecone round trip; entries expire
+        # after RAG_CACHE_TTL since re-ingesting into Pinecone doesn't clear them
+        self.cache = SearchCache(max_entries=1024, similarity_threshold=RAG_CACHE_THRESHOLD,
+                                 ttl_seconds=RAG_CACHE_TTL)
 
     def search_video_clips(self, query: str, top_k: int = 5) -> List[Dict]:
         """
         Search for video clips matching the query using RAG
         """
+        cached = self.cache.get_exact(query, top_k)
+        if cached is not None:
+            # Copy rows so callers can't modify the cached results
+            return [dict(clip) for clip in cached]
+
         # Create embedding for query
-        query_embedding = self.embedding_service.create_embeddings([query])[0]
+        query_embedding = self._embed_query(query)
+
+        cached = self.cache.get_similar(query_embedding, top_k)
+        if cached is not None:
+            return [dict(clip) for clip in cached]
         
         # Search in Pinecone
         results = self.pinecone_service.search(
-            query_embedding=query_embedding.tolist(),
+            query_embedding=query_embedding,
             top_k=top_k
         )
         
@@ -37,8 +57,9 @@ class RAGService:
                 'transcript': result['text'],
                 'relevance_score': result['score'],
             })
-        
-        return clips
+
+        self.cache.put(query, top_k, query_embedding, clips)
+        return [dict(clip) for clip in clips]
 
     def get_clip_context(self, clip: Dict, context_seconds: float = 5.0) -> Dict:
         """
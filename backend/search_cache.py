@@ -0,0 +1,100 @@
+"""
+In-memory cache for search results, with an exact-match and a semantic tier
+"""
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+import threading
+import time
+import numpy as np
+
+
+class SearchCache:
+    def __init__(self, max_entries: int = 1024, similarity_threshold: float = 0.95,
+                 ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        # Entries older than this are ignored, which bounds staleness in processes
+        # that never see the clear() after an ingest (e.g. other uvicorn workers)
+        self.ttl_seconds = ttl_seconds
+
+        # (normalized query, top_k) -> (unit query embedding, results, expiry time), in LRU order
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[np.ndarray, List[Dict], float]]" = OrderedDict()
+        # Stacked embeddings and expiry times for the semantic tier, rebuilt lazily after changes
+        self._keys: List[Tuple[str, int]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._expires: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def get_exact(self, query: str, top_k: int) -> Optional[List[Dict]]:
+        """
+        Return cached results for the same query text and top_k
+        """
+        key = (self._normalize_query(query), top_k)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._entries[key]
+                self._matrix = None
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def get_similar(self, query_embedding: np.ndarray, top_k: int) -> Optional[List[Dict]]:
+        """
+        Return cached results of the most similar earlier query with the same top_k,
+        if its cosine similarity is above the threshold
+        """
+        query_vector = self._unit(query_embedding)
+        with self._lock:
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._keys = list(self._entries.keys())
+                self._matrix = np.stack([embedding for embedding, _, _ in self._entries.values()])
+                self._expires = np.array([expires for _, _, expires in self._entries.values()])
+
+            scores = self._matrix @ query_vector
+            # Only consider live entries that were searched with the same top_k
+            scores[[key[1] != top_k for key in self._keys]] = -1.0
+            scores[self._expires <= time.monotonic()] = -1.0
+
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            key = self._keys[best]
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+
+    def put(self, query: str, top_k: int, query_embedding: np.ndarray, results: List[Dict]):
+        key = (self._normalize_query(query), top_k)
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        with self._lock:
+            self._entries[key] = (self._unit(query_embedding), results, expires)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        """
+        Drop all entries, e.g. after new videos were ingested
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys = []
+            self._matrix = None
+            self._expires = None
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        # EmbeddingService already returns unit vectors; this keeps the cache safe for any input
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
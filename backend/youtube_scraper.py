@@ -2,14 +2,61 @@
 YouTube playlist scraper to extract video information and transcripts
 """
 import yt_dlp
-import json
-from typing import List, Dict, Optional
+import requests
+import asyncio
+import logging
+import orjson
+from typing import List, Dict, Optional, AsyncIterator
 import re
-import whisper
 import tempfile
 import os
-import glob
+import atexit
+import shutil
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend.config import (
+    CACHE_DIR, WHISPER_MODEL_SIZE, WHISPER_COMPUTE_TYPE, WHISPER_BATCH_SIZE, TRANSCRIPT_WORKERS
+)
+
+# Prefer faster-whisper (CTranslate2, int8) and fall back to openai-whisper
+try:
+    import ctranslate2
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+    import whisper
+
+try:
+    # Batched transcription of a video's 30 s chunks (faster-whisper >= 1.1)
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
+
+logger = logging.getLogger("nptel.youtube_scraper")
+
+# A VTT cue: timestamp line (00:00:00.000 --> 00:00:00.000) and the text lines up to the next empty line
+_CUE_RE = re.compile(
+    r'^[ \t]*(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2})\.(\d{3})[^\n]*\n?'
+    r'((?:(?![ \t]*\d{2}:\d{2}:\d{2}\.\d{3}\s*-->)[^\r\n]+(?:\r?\n|\r?\Z))*)',
+    re.MULTILINE
+)
+_TAG_RE = re.compile(r'<[^>]+>')
+# Tag-only lines and VTT header/metadata blocks that aren't caption text
+_VTT_SKIP_PREFIXES = ('<', 'WEBVTT', 'NOTE', 'STYLE', 'REGION', 'X-TIMESTAMP-MAP', 'Kind:', 'Language:')
+_VIDEO_ID_RE = re.compile(r'(?:v=|youtu\.be/|/shorts/)([\w-]{11})')
+
+# Playlist entries that can't have a usable transcript, skipped before any per-video request
+_SKIP_AVAILABILITY = ('private', 'needs_auth', 'premium_only', 'subscriber_only')
+_SKIP_LIVE_STATUS = ('is_live', 'is_upcoming')
+
+# Loaded once per process and shared by all scrapers (loading takes seconds)
+_whisper_model = None
+_whisper_model_lock = threading.Lock()
+# One transcription at a time; other videos keep downloading meanwhile
+_whisper_transcribe_lock = threading.Lock()
 
 
 class YouTubeScraper:
@@ -22,6 +69,51 @@ class YouTubeScraper:
             'writesubtitles': False,
             'writeautomaticsub': False,
         }
+        self.cache_dir = os.path.join(CACHE_DIR, "transcripts")
+
+        # One scratch directory for downloaded audio, removed at exit
+        self.temp_dir = tempfile.mkdtemp(prefix="amagi-scraper-")
+        atexit.register(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+        # Shared HTTP connection pool for subtitle downloads, with a keep-alive
+        # connection per worker thread so TLS handshakes happen once per worker
+        self._http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=TRANSCRIPT_WORKERS)
+        self._http.mount("https://", adapter)
+        self._http.mount("http://", adapter)
+
+        # Per-thread YoutubeDL instances and temp file prefix (see _get_ydl)
+        self._local = threading.local()
+
+        # Threads for the async fetches. Kept apart from the event loop's default executor,
+        # which the LLM, embedding and Neo4j work uses, so transcript threads (some blocked
+        # on the Whisper lock) never starve it; its size is the concurrency limit
+        self._executor = ThreadPoolExecutor(max_workers=TRANSCRIPT_WORKERS, thread_name_prefix="transcripts")
+
+    def close(self):
+        # Drop fetches that haven't started; running ones finish in the background
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_ydl(self, kind: str, ydl_opts: Dict) -> yt_dlp.YoutubeDL:
+        """
+        Return this thread's YoutubeDL for `kind`, creating it with ydl_opts on first use.
+        Constructing one loads all extractors, so it is reused across videos;
+        instances aren't thread-safe, so each thread gets its own.
+        """
+        ydls = getattr(self._local, 'ydls', None)
+        if ydls is None:
+            ydls = self._local.ydls = {}
+        ydl = ydls.get(kind)
+        if ydl is None:
+            ydl = ydls[kind] = yt_dlp.YoutubeDL(ydl_opts)
+        return ydl
+
+    def _thread_temp_id(self) -> str:
+        # Unique per thread, so concurrent downloads never collide on file names
+        temp_id = getattr(self._local, 'temp_id', None)
+        if temp_id is None:
+            temp_id = self._local.temp_id = str(uuid.uuid4())
+        return temp_id
 
     def get_playlist_videos(self, playlist_url: str) -> List[Dict]:
         """
@@ -35,73 +127,83 @@ class YouTubeScraper:
         }
         
         videos = []
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                print(f"Extracting playlist information from: {playlist_url}")
-                info = ydl.extract_info(playlist_url, download=False)
-                
-                if not info:
-                    print("Error: No playlist information returned")
-                    return videos
-                
-                print(f"Playlist title: {info.get('title', 'Unknown')}")
-                print(f"Playlist ID: {info.get('id', 'Unknown')}")
+        ydl = self._get_ydl('playlist', ydl_opts)
+        try:
+            logger.info("Extracting playlist information from: %s", playlist_url)
+            info = ydl.extract_info(playlist_url, download=False)
+            
+            if not info:
+                logger.error("No playlist information returned")
+                return videos
+            
+            logger.info("Playlist title: %s", info.get('title', 'Unknown'))
+            logger.debug("Playlist ID: %s", info.get('id', 'Unknown'))
+            
+            # Check if it's a playlist or a single video
+            if 'entries' in info:
+                entries = info['entries']
+                logger.info("Found %d entries in playlist", len(entries) if entries else 0)
                 
-                # Check if it's a playlist or a single video
-                if 'entries' in info:
-                    entries = info['entries']
-                    print(f"Found {len(entries) if entries else 0} entries in playlist")
-                    
-                    if entries:
-                        for i, entry in enumerate(entries):
-                            if entry is None:
-                                print(f"Warning: Entry {i} is None (might be unavailable)")
-                                continue
-                            
-                            video_id = entry.get('id')
-                            title = entry.get('title', 'Unknown')
-                            
-                            if not video_id:
-                                print(f"Warning: Entry {i} has no video ID")
-                                continue
-                            
-                            videos.append({
-                                'video_id': video_id,
-                                'title': title,
-                                'url': f"https://www.youtube.com/watch?v={video_id}",
-                            })
-                            print(f"  Added video {i+1}: {title}")
-                    else:
-                        print("Warning: Playlist entries list is empty")
-                else:
-                    # Might be a single video instead of a playlist
-                    if info.get('id'):
-                        print("Single video detected (not a playlist)")
+                if entries:
+                    for i, entry in enumerate(entries):
+                        if entry is None:
+                            logger.warning("Entry %d is None (might be unavailable)", i)
+                            continue
+                        
+                        video_id = entry.get('id')
+                        title = entry.get('title', 'Unknown')
+                        
+                        if not video_id:
+                            logger.warning("Entry %d has no video ID", i)
+                            continue
+
+                        # Flat entries already say whether a video can be fetched at all
+                        availability = entry.get('availability')
+                        live_status = entry.get('live_status')
+                        skip_reason = (availability if availability in _SKIP_AVAILABILITY
+                                       else live_status if live_status in _SKIP_LIVE_STATUS
+                                       else None)
+                        if skip_reason:
+                            logger.info("Skipping %s (%s)", title, skip_reason)
+                            continue
+                        
                         videos.append({
-                            'video_id': info.get('id'),
-                            'title': info.get('title', 'Unknown'),
-                            'url': playlist_url if 'watch?v=' in playlist_url else f"https://www.youtube.com/watch?v={info.get('id')}",
+                            'video_id': video_id,
+                            'title': title,
+                            'url': f"https://www.youtube.com/watch?v={video_id}",
                         })
-                    else:
-                        print("Error: No entries found and no video ID")
-                        
-            except yt_dlp.utils.DownloadError as e:
-                error_msg = str(e)
-                print(f"Download error: {error_msg}")
-                if "Private video" in error_msg or "This video is private" in error_msg:
-                    raise Exception("Playlist contains private videos. Please make the playlist public or unlisted.")
-                elif "Video unavailable" in error_msg or "This video is unavailable" in error_msg:
-                    raise Exception("Some videos in the playlist are unavailable.")
-                elif "Sign in" in error_msg or "login" in error_msg.lower():
-                    raise Exception("Playlist might require authentication. Please ensure the playlist is public.")
+                        logger.debug("Added video %d: %s", i + 1, title)
                 else:
-                    raise Exception(f"Failed to extract playlist: {error_msg}")
-            except Exception as e:
-                error_msg = str(e)
-                print(f"Error extracting playlist: {error_msg}")
+                    logger.warning("Playlist entries list is empty")
+            else:
+                # Might be a single video instead of a playlist
+                if info.get('id'):
+                    logger.info("Single video detected (not a playlist)")
+                    videos.append({
+                        'video_id': info.get('id'),
+                        'title': info.get('title', 'Unknown'),
+                        'url': playlist_url if 'watch?v=' in playlist_url else f"https://www.youtube.com/watch?v={info.get('id')}",
+                    })
+                else:
+                    logger.error("No entries found and no video ID")
+                    
+        except yt_dlp.utils.DownloadError as e:
+            error_msg = str(e)
+            logger.error("Download error: %s", error_msg)
+            if "Private video" in error_msg or "This video is private" in error_msg:
+                raise Exception("Playlist contains private videos. Please make the playlist public or unlisted.")
+            elif "Video unavailable" in error_msg or "This video is unavailable" in error_msg:
+                raise Exception("Some videos in the playlist are unavailable.")
+            elif "Sign in" in error_msg or "login" in error_msg.lower():
+                raise Exception("Playlist might require authentication. Please ensure the playlist is public.")
+            else:
                 raise Exception(f"Failed to extract playlist: {error_msg}")
+        except Exception as e:
+            error_msg = str(e)
+            logger.error("Error extracting playlist: %s", error_msg)
+            raise Exception(f"Failed to extract playlist: {error_msg}")
         
-        print(f"Total videos extracted: {len(videos)}")
+        logger.info("Total videos extracted: %d", len(videos))
         return videos
 
     def get_video_transcript(self, video_url: str) -> Optional[Dict]:
@@ -109,139 +211,193 @@ class YouTubeScraper:
         Extract transcript with timestamps from a YouTube video
         Returns: Dict with video info and transcript segments
         """
-        # Use a unique temp filename to avoid collisions
-        temp_id = str(uuid.uuid4())
-        temp_template = f"temp_subs_{temp_id}_%(id)s"
-        
-        ydl_opts = {
-            **self.ydl_opts,
-            'writesubtitles': True,
-            'writeautomaticsub': True,
-            'subtitleslangs': ['en'],
-            'subtitlesformat': 'vtt',
-            'skip_download': True,
-            'outtmpl': temp_template,
-        }
-        
+        # Transcripts are cached per video id, so re-ingesting a playlist skips yt-dlp
+        cache_video_id = self._video_id_from_url(video_url)
+        if cache_video_id:
+            cached = self._load_cached_transcript(cache_video_id)
+            if cached is not None:
+                logger.debug("Using cached transcript (%d segments) for %s", len(cached['transcript']), cache_video_id)
+                return cached
+
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # download=True is needed to trigger subtitle download even if skip_download is True for video
-                info = ydl.extract_info(video_url, download=True)
-                
-                video_id = info.get('id')
-                title = info.get('title')
-                description = info.get('description', '')
-                duration = info.get('duration', 0)
-                
-                transcript_segments = []
-                
-                # Find the downloaded subtitle file
-                # yt-dlp appends language code, e.g., .en.vtt
-                search_pattern = f"temp_subs_{temp_id}_{video_id}.*.vtt"
-                found_files = glob.glob(search_pattern)
-                
-                if found_files:
-                    vtt_file = found_files[0]
-                    print(f"  ✓ Found subtitle file: {vtt_file}")
-                    try:
-                        with open(vtt_file, 'r', encoding='utf-8') as f:
-                            vtt_content = f.read()
-                            transcript_segments = self._parse_vtt(vtt_content)
-                            
-                        if transcript_segments:
-                            print(f"  ✓ Successfully extracted {len(transcript_segments)} transcript segments")
-                        else:
-                            print(f"  ⚠ No transcript segments parsed from file")
-                    except Exception as e:
-                        print(f"  ⚠ Error reading/parsing subtitle file: {e}")
-                    finally:
-                        # Clean up
-                        try:
-                            os.remove(vtt_file)
-                        except:
-                            pass
-                else:
-                    print(f"  ⚠ No subtitle file downloaded for this video")
-                
-                if not transcript_segments:
-                    # Try Whisper fallback
-                    transcript_segments = self._generate_whisper_transcript(video_url, duration)
-                    print(f"  ✗ No transcript segments extracted for this video")
-                
-                return {
-                    'video_id': video_id,
-                    'title': title,
-                    'description': description,
-                    'duration': duration,
-                    'url': video_url,
-                    'transcript': transcript_segments,
-                }
+            # Metadata only; the subtitle file is fetched directly below, not written to disk
+            ydl = self._get_ydl('info', self.ydl_opts)
+            info = ydl.extract_info(video_url, download=False)
+            
+            video_id = info.get('id')
+            title = info.get('title')
+            description = info.get('description', '')
+            duration = info.get('duration', 0)
+            
+            transcript_segments = []
+            
+            vtt_url = self._pick_vtt_url(info)
+            if vtt_url:
+                try:
+                    response = self._http.get(vtt_url, timeout=30)
+                    response.raise_for_status()
+                    transcript_segments = self._parse_vtt(response.text)
+                        
+                    if transcript_segments:
+                        logger.debug("Extracted %d transcript segments from %s", len(transcript_segments), video_id)
+                    else:
+                        logger.warning("No transcript segments parsed for %s", video_id)
+                except Exception as e:
+                    logger.warning("Error fetching/parsing subtitles for %s: %s", video_id, e)
+            else:
+                logger.debug("No English subtitles available for %s", video_id)
+            
+            if not transcript_segments:
+                # Try Whisper fallback
+                transcript_segments = self._generate_whisper_transcript(video_url, duration)
+                logger.debug("No subtitle segments extracted for %s", video_id)
+            
+            video_data = {
+                'video_id': video_id,
+                'title': title,
+                'description': description,
+                'duration': duration,
+                'url': video_url,
+                'transcript': transcript_segments,
+            }
+            # Don't cache misses; captions may be added later
+            if transcript_segments and video_id:
+                self._store_cached_transcript(video_id, video_data)
+            return video_data
         except Exception as e:
-            print(f"Error extracting transcript from {video_url}: {e}")
-            # Clean up any leftover files
-            try:
-                for f in glob.glob(f"temp_subs_{temp_id}_*"):
-                    os.remove(f)
-            except:
-                pass
+            logger.warning("Error extracting transcript from %s: %s", video_url, e)
+            return None
+
+    @staticmethod
+    def _pick_vtt_url(info: Dict) -> Optional[str]:
+        """
+        URL of the English VTT track, preferring uploaded subtitles over automatic captions
+        """
+        for tracks in (info.get('subtitles'), info.get('automatic_captions')):
+            for fmt in (tracks or {}).get('en') or []:
+                if fmt.get('ext') == 'vtt' and fmt.get('url'):
+                    return fmt['url']
+        return None
+
+    @staticmethod
+    def _video_id_from_url(video_url: str) -> Optional[str]:
+        match = _VIDEO_ID_RE.search(video_url)
+        return match.group(1) if match else None
+
+    def _cache_path(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.json")
+
+    def _load_cached_transcript(self, video_id: str) -> Optional[Dict]:
+        try:
+            with open(self._cache_path(video_id), 'rb') as f:
+                data = f.read()
+            return orjson.loads(data)
+        except (OSError, ValueError):
             return None
 
+    def _store_cached_transcript(self, video_id: str, video_data: Dict):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial file
+            tmp_path = f"{self._cache_path(video_id)}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(video_data))
+            os.replace(tmp_path, self._cache_path(video_id))
+        except OSError as e:
+            logger.warning("Could not cache transcript: %s", e)
+
     def _parse_vtt(self, vtt_content: str) -> List[Dict]:
         """
         Parse VTT subtitle format to extract text with timestamps
         """
         segments = []
-        lines = vtt_content.split('\n')
-        
-        current_segment = None
-        current_text = []
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Check for timestamp line (format: 00:00:00.000 --> 00:00:00.000)
-            timestamp_match = re.match(r'(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2})\.(\d{3})', line)
-            if timestamp_match:
-                if current_segment and current_text:
-                    current_segment['text'] = ' '.join(current_text)
-                    segments.append(current_segment)
-                
-                start_time = self._vtt_time_to_seconds(
-                    timestamp_match.group(1), timestamp_match.group(2),
-                    timestamp_match.group(3), timestamp_match.group(4)
-                )
-                end_time = self._vtt_time_to_seconds(
-                    timestamp_match.group(5), timestamp_match.group(6),
-                    timestamp_match.group(7), timestamp_match.group(8)
-                )
-                
-                current_segment = {
-                    'start': start_time,
-                    'end': end_time,
-                    'text': ''
-                }
-                current_text = []
-            elif line and current_segment and not line.startswith('WEBVTT') and not line.startswith('<'):
-                # Remove HTML tags and append text
-                clean_text = re.sub(r'<[^>]+>', '', line)
-                if clean_text:
-                    current_text.append(clean_text)
-        
-        # Add last segment
-        if current_segment and current_text:
-            current_segment['text'] = ' '.join(current_text)
-            segments.append(current_segment)
-        
+        # Auto-captions roll: each cue repeats the previous cue's line before adding
+        # a new one, so a line equal to the last kept line is dropped
+        last_line = None
+        for match in _CUE_RE.finditer(vtt_content):
+            g = match.group
+            text_lines = []
+            for line in g(9).split('\n'):
+                line = line.strip()
+                if line and not line.startswith(_VTT_SKIP_PREFIXES):
+                    # Remove HTML tags (most lines have none, so skip the regex for those)
+                    clean_text = _TAG_RE.sub('', line) if '<' in line else line
+                    if clean_text and clean_text != last_line:
+                        text_lines.append(clean_text)
+                        last_line = clean_text
+            if text_lines:
+                segments.append({
+                    'start': int(g(1)) * 3600 + int(g(2)) * 60 + int(g(3)) + int(g(4)) / 1000.0,
+                    'end': int(g(5)) * 3600 + int(g(6)) * 60 + int(g(7)) + int(g(8)) / 1000.0,
+                    'text': ' '.join(text_lines)
+                })
         return segments
 
-    def _vtt_time_to_seconds(self, hours: str, minutes: str, seconds: str, milliseconds: str) -> float:
-        """Convert VTT timestamp to seconds"""
-        return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(milliseconds) / 1000.0
-
     def get_playlist_with_transcripts(self, playlist_url: str) -> List[Dict]:
         """
         Get all videos from playlist with their transcripts
         """
+        videos = self._get_playlist_videos_checked(playlist_url)
+        results: List[Optional[Dict]] = [None] * len(videos)
+
+        # Fetching captions (and audio for the Whisper fallback) is network bound,
+        # so several videos are fetched at once; results keep playlist order
+        with ThreadPoolExecutor(max_workers=max(1, min(TRANSCRIPT_WORKERS, len(videos)))) as executor:
+            futures = {executor.submit(self.get_video_transcript, video['url']): i
+                       for i, video in enumerate(videos)}
+            for completed, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                results[i] = future.result()
+                logger.debug("[%d/%d] Fetched: %s", completed, len(videos), videos[i]['title'])
+
+        return self._collect_transcripts(videos, results)
+
+    async def get_playlist_with_transcripts_async(self, playlist_url: str) -> List[Dict]:
+        """
+        Async version of get_playlist_with_transcripts for use inside the event loop.
+        yt-dlp is synchronous, so each video is fetched on the scraper's own
+        thread pool; at most TRANSCRIPT_WORKERS fetches run at once.
+        """
+        loop = asyncio.get_running_loop()
+        videos = await loop.run_in_executor(self._executor, self._get_playlist_videos_checked, playlist_url)
+
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self.get_video_transcript, video['url']) for video in videos
+        ))
+        return self._collect_transcripts(videos, results)
+
+    async def iter_playlist_with_transcripts(self, playlist_url: str) -> AsyncIterator[Dict]:
+        """
+        Yield each playlist video with its transcript as soon as it is fetched
+        (completion order, not playlist order), so callers can start processing
+        it while the remaining videos are still downloading.
+        """
+        loop = asyncio.get_running_loop()
+        videos = await loop.run_in_executor(self._executor, self._get_playlist_videos_checked, playlist_url)
+
+        async def fetch(video: Dict):
+            # The scraper's pool limits concurrency and keeps the default executor free
+            # for the chapter/embedding work that overlaps these downloads
+            return video, await loop.run_in_executor(self._executor, self.get_video_transcript, video['url'])
+
+        tasks = [asyncio.ensure_future(fetch(video)) for video in videos]
+        yielded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                video, video_data = await next_done
+                if video_data and video_data['transcript']:
+                    yielded += 1
+                    yield video_data
+                else:
+                    logger.info("No transcript available for %s", video['title'])
+        finally:
+            # The consumer may stop early; don't leave fetches queued
+            for task in tasks:
+                task.cancel()
+
+        logger.info("Successfully processed %d/%d videos with transcripts", yielded, len(videos))
+
+    def _get_playlist_videos_checked(self, playlist_url: str) -> List[Dict]:
         videos = self.get_playlist_videos(playlist_url)
         
         if not videos:
@@ -251,22 +407,25 @@ class YouTubeScraper:
                           "3. The playlist contains videos\n"
                           "4. You have internet connection")
         
-        print(f"\nProcessing {len(videos)} videos for transcripts...")
+        logger.info("Processing %d videos for transcripts...", len(videos))
+        return videos
+
+    def _collect_transcripts(self, videos: List[Dict], results: List[Optional[Dict]]) -> List[Dict]:
+        """
+        Keep the videos whose transcript could be extracted, in playlist order
+        """
         videos_with_transcripts = []
-        
-        for i, video in enumerate(videos, 1):
-            print(f"\n[{i}/{len(videos)}] Processing: {video['title']}")
-            video_data = self.get_video_transcript(video['url'])
+        for video, video_data in zip(videos, results):
             if video_data:
                 if video_data['transcript']:
-                    print(f"  ✓ Transcript found: {len(video_data['transcript'])} segments")
+                    logger.debug("Transcript found: %d segments", len(video_data['transcript']))
                     videos_with_transcripts.append(video_data)
                 else:
-                    print(f"  ✗ No transcript available for this video")
+                    logger.info("No transcript available for %s", video['title'])
             else:
-                print(f"  ✗ Failed to extract video data")
+                logger.info("Failed to extract video data for %s", video['title'])
         
-        print(f"\nSuccessfully processed {len(videos_with_transcripts)}/{len(videos)} videos with transcripts")
+        logger.info("Successfully processed %d/%d videos with transcripts", len(videos_with_transcripts), len(videos))
         return videos_with_transcripts
 
 
@@ -274,59 +433,45 @@ class YouTubeScraper:
         """
         Generate transcript using Whisper for videos without subtitles
         """
-        print(f"  🔄 Generating transcript with Whisper (this may take a while)...")
+        logger.info("Generating transcript with Whisper for %s (this may take a while)...", video_url)
 
         # Download audio
-        temp_id = str(uuid.uuid4())
-        audio_template = f"temp_audio_{temp_id}_%(id)s.%(ext)s"
+        temp_id = self._thread_temp_id()
+        audio_template = os.path.join(self.temp_dir, f"temp_audio_{temp_id}_%(id)s.%(ext)s")
 
         ydl_opts = {
             'format': 'bestaudio/best',
             'outtmpl': audio_template,
             'quiet': True,
             'no_warnings': True,
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
+            # Keep the original (opus/m4a) stream; Whisper decodes it directly,
+            # so transcoding to mp3 first would only add an encode and decode pass
         }
 
         audio_file = None
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=True)
-                video_id = info.get('id')
-
-                # Find the downloaded audio file
-                search_pattern = f"temp_audio_{temp_id}_{video_id}.mp3"
-                found_files = glob.glob(search_pattern)
-
-                if not found_files:
-                    print(f"  ✗ Failed to download audio")
-                    return []
-
-                audio_file = found_files[0]
-                print(f"  ✓ Downloaded audio: {audio_file}")
-
-                # Load Whisper model (tiny)
-                model = whisper.load_model("tiny")
-                result = model.transcribe(audio_file, language='en')
-
-                # Convert to the same format as VTT segments
-                segments = []
-                for segment in result['segments']:
-                    segments.append({
-                        'start': segment['start'],
-                        'end': segment['end'],
-                        'text': segment['text'].strip()
-                    })
+            ydl = self._get_ydl('audio', ydl_opts)
+            info = ydl.extract_info(video_url, download=True)
+
+            # yt-dlp records the path of the downloaded audio file
+            downloads = info.get('requested_downloads') or [{}]
+            audio_file = downloads[0].get('filepath')
+
+            if not audio_file or not os.path.exists(audio_file):
+                logger.warning("Failed to download audio for %s", video_url)
+                return []
 
-                print(f"  ✓ Generated {len(segments)} transcript segments with Whisper")
-                return segments
+            logger.debug("Downloaded audio: %s", audio_file)
+
+            model = self._load_whisper_model()
+            with _whisper_transcribe_lock:
+                segments = self._transcribe_audio(model, audio_file)
+
+            logger.info("Generated %d transcript segments with Whisper", len(segments))
+            return segments
 
         except Exception as e:
-            print(f"  ✗ Whisper transcription failed: {e}")
+            logger.warning("Whisper transcription failed for %s: %s", video_url, e)
             return []
         finally:
             # Clean up audio file
@@ -335,3 +480,47 @@ class YouTubeScraper:
                     os.remove(audio_file)
                 except:
                     pass
+
+    def _load_whisper_model(self):
+        """
+        Load the Whisper model (WHISPER_MODEL_SIZE, "tiny.en" by default) on first use
+        and reuse it for every later transcription in this process
+        """
+        global _whisper_model
+        with _whisper_model_lock:
+            if _whisper_model is None:
+                if WhisperModel is None:
+                    _whisper_model = whisper.load_model(WHISPER_MODEL_SIZE)
+                else:
+                    device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+                    compute_type = WHISPER_COMPUTE_TYPE or ("int8_float16" if device == "cuda" else "int8")
+                    _whisper_model = WhisperModel(WHISPER_MODEL_SIZE, device=device, compute_type=compute_type,
+                                                  cpu_threads=os.cpu_count() or 0)
+            return _whisper_model
+
+    def _transcribe_audio(self, model, audio_file: str) -> List[Dict]:
+        """
+        Transcribe an audio file into segments in the same format as VTT segments
+        """
+        if WhisperModel is None:
+            result = model.transcribe(audio_file, language='en')
+            return [{
+                'start': segment['start'],
+                'end': segment['end'],
+                'text': segment['text'].strip()
+            } for segment in result['segments']]
+
+        if BatchedInferencePipeline is not None and WHISPER_BATCH_SIZE > 1:
+            # Splits the audio on speech and decodes up to WHISPER_BATCH_SIZE chunks per forward pass
+            pipeline = BatchedInferencePipeline(model=model)
+            segments, _ = pipeline.transcribe(audio_file, language='en', beam_size=1,
+                                              batch_size=WHISPER_BATCH_SIZE)
+        else:
+            # Greedy decoding, like openai-whisper's default; segments is a generator.
+            # Silero VAD drops silence and music first, so fewer 30 s windows are decoded
+            segments, _ = model.transcribe(audio_file, language='en', beam_size=1, vad_filter=True)
+        return [{
+            'start': segment.start,
+            'end': segment.end,
+            'text': segment.text.strip()
+        } for segment in segments]
@@ -1,14 +1,25 @@
 """
 Check which videos in a playlist have transcripts available
 """
+import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from backend.youtube_scraper import YouTubeScraper
 
+# Videos probed at once; lower it if YouTube starts rate limiting
+CHECK_WORKERS = int(os.getenv("CHECK_WORKERS", "8"))
+
+BAR = "=" * 70
+
+def _banner(title, leading_newline=False):
+    """Print a title between two bars in a single write"""
+    prefix = "\n" if leading_newline else ""
+    sys.stdout.write(f"{prefix}{BAR}\n{title}\n{BAR}\n")
+
 def check_playlist_transcripts(playlist_url):
     """Check which videos in the playlist have transcripts"""
-    print("=" * 70)
-    print("Checking Playlist for Videos with Transcripts")
-    print("=" * 70)
+    _banner("Checking Playlist for Videos with Transcripts")
     print(f"Playlist URL: {playlist_url}\n")
     
     scraper = YouTubeScraper()
@@ -22,38 +33,36 @@ def check_playlist_transcripts(playlist_url):
         return
     
     print(f"✓ Found {len(videos)} videos in playlist\n")
-    print("=" * 70)
-    print("Step 2: Checking transcripts for each video...")
-    print("=" * 70)
+    _banner("Step 2: Checking transcripts for each video...")
     
     videos_with_transcripts = []
     videos_without_transcripts = []
     
-    for i, video in enumerate(videos, 1):
-        print(f"\n[{i}/{len(videos)}] Checking: {video['title']}")
-        print(f"    URL: {video['url']}")
-        
-        video_data = scraper.get_video_transcript(video['url'])
-        
-        if video_data and video_data['transcript']:
-            segment_count = len(video_data['transcript'])
-            videos_with_transcripts.append({
-                'title': video['title'],
-                'video_id': video['video_id'],
-                'segments': segment_count
-            })
-            print(f"    ✓ HAS TRANSCRIPTS: {segment_count} segments")
-        else:
-            videos_without_transcripts.append({
-                'title': video['title'],
-                'video_id': video['video_id']
-            })
-            print(f"    ✗ NO TRANSCRIPTS")
+    # Probe videos concurrently; map() still returns results in playlist order
+    with ThreadPoolExecutor(max_workers=max(1, min(CHECK_WORKERS, len(videos)))) as executor:
+        results = executor.map(scraper.get_video_transcript, [video['url'] for video in videos])
+
+        for i, (video, video_data) in enumerate(zip(videos, results), 1):
+            print(f"\n[{i}/{len(videos)}] Checked: {video['title']}")
+            print(f"    URL: {video['url']}")
+
+            if video_data and video_data['transcript']:
+                segment_count = len(video_data['transcript'])
+                videos_with_transcripts.append({
+                    'title': video['title'],
+                    'video_id': video['video_id'],
+                    'segments': segment_count
+                })
+                print(f"    ✓ HAS TRANSCRIPTS: {segment_count} segments")
+            else:
+                videos_without_transcripts.append({
+                    'title': video['title'],
+                    'video_id': video['video_id']
+                })
+                print(f"    ✗ NO TRANSCRIPTS")
     
     # Summary
-    print("\n" + "=" * 70)
-    print("SUMMARY")
-    print("=" * 70)
+    _banner("SUMMARY", leading_newline=True)
     print(f"Total videos: {len(videos)}")
     print(f"Videos WITH transcripts: {len(videos_with_transcripts)}")
     print(f"Videos WITHOUT transcripts: {len(videos_without_transcripts)}")
@@ -68,7 +77,7 @@ def check_playlist_transcripts(playlist_url):
         for video in videos_without_transcripts:
             print(f"  - {video['title']}")
     
-    print("\n" + "=" * 70)
+    print("\n" + BAR)
     if videos_with_transcripts:
         print(f"✓ {len(videos_with_transcripts)} video(s) can be processed")
         print("You can process the playlist, but only videos with transcripts will be indexed.")
@@ -79,9 +88,11 @@ def check_playlist_transcripts(playlist_url):
         print("2. Enable automatic captions on the videos in YouTube Studio")
         print("3. Try an NPTEL playlist (they usually have captions):")
         print("   https://www.youtube.com/playlist?list=PLbMVogVj5nJQ2vsW_hmyvVfO4GYWaaPpO")
-    print("=" * 70)
+    print(BAR)
 
 if __name__ == "__main__":
+    # The scraper reports progress through the nptel.* loggers
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     if len(sys.argv) > 1:
         url = sys.argv[1]
     else:
@@ -2,6 +2,10 @@ import yt_dlp
 import requests
 import re
 
+# Compiled once instead of looked up on every line
+_VTT_TS = re.compile(r'(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2})\.(\d{3})')
+_VTT_TAG = re.compile(r'<[^>]+>')
+
 def debug_vtt(video_url):
     ydl_opts = {
         'quiet': True,
@@ -49,7 +53,7 @@ def parse_vtt(vtt_content):
         line = line.strip()
         
         # Check for timestamp line (format: 00:00:00.000 --> 00:00:00.000)
-        timestamp_match = re.match(r'(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2})\.(\d{3})', line)
+        timestamp_match = _VTT_TS.match(line)
         if timestamp_match:
             if current_segment and current_text:
                 current_segment['text'] = ' '.join(current_text)
@@ -59,7 +63,7 @@ def parse_vtt(vtt_content):
             current_segment = {'text': ''}
             current_text = []
         elif line and current_segment and not line.startswith('WEBVTT') and not line.startswith('<'):
-            clean_text = re.sub(r'<[^>]+>', '', line)
+            clean_text = _VTT_TAG.sub('', line)
             if clean_text:
                 current_text.append(clean_text)
     
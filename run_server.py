@@ -2,18 +2,25 @@
 Script to run the FastAPI server
 """
 import uvicorn
+import importlib.util
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from backend.config import UVICORN_WORKERS
+
 if __name__ == "__main__":
+    # uvloop/httptools ship with uvicorn[standard] (uvloop is not available on Windows)
     uvicorn.run(
         "backend.main:app",
         host="0.0.0.0",
         port=8000,
         reload=False,
+        workers=UVICORN_WORKERS,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
         log_level="info"
     )
 
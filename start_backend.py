@@ -12,8 +12,12 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
 # Now run uvicorn
+import importlib.util
 import uvicorn
 
+# "dev" (default) auto-reloads on code changes; anything else runs the production setup
+AMAGI_ENV = os.environ.get("AMAGI_ENV", "dev")
+
 if __name__ == "__main__":
     print("Starting NPTEL Video Search Engine Backend...")
     print(f"Project root: {project_root}")
@@ -21,5 +25,19 @@ if __name__ == "__main__":
     print("API docs at: http://localhost:8000/docs")
     print("\nPress CTRL+C to stop the server\n")
 
-    # Use import string instead of app object for reload to work
-    uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
+    if AMAGI_ENV == "dev":
+        # Use import string instead of app object for reload to work
+        uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        from backend.config import UVICORN_WORKERS
+
+        # No reload watcher; several workers on uvloop/httptools (from uvicorn[standard])
+        uvicorn.run(
+            "backend.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=False,
+            workers=UVICORN_WORKERS,
+            loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+            http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        )
@@ -8,15 +8,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 def test_neo4j_connection():
-    uri = os.getenv("NEO4J_URI")
-    user = os.getenv("NEO4J_USER")
-    password = os.getenv("NEO4J_PASSWORD")
+    uri, user, password = (os.environ.get(k) for k in ("NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD"))
 
     print(f"Attempting to connect to: {uri}")
     print(f"User: {user}")
-    print(f"Password: {'*' * len(password) if password else 'Not set'}")
+    print("Password: set" if password else "Password: Not set")
 
-    if not uri or not user or not password:
+    if not all((uri, user, password)):
         print("❌ Missing Neo4j credentials in .env file")
         print("Make sure NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD are set")
         return False
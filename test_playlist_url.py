@@ -2,6 +2,7 @@
 Quick test script to check if a playlist URL is accessible
 """
 import sys
+from itertools import islice
 import yt_dlp
 
 def test_playlist_url(playlist_url):
@@ -32,12 +33,13 @@ def test_playlist_url(playlist_url):
             print(f"✓ Playlist Type: {info.get('_type', 'Unknown')}")
             
             if 'entries' in info:
-                entries = info['entries']
-                print(f"\n✓ Found {len(entries) if entries else 0} entries")
+                # entries may be a lazy iterator; only take the sample that is printed
+                entries = list(islice(info['entries'] or (), 5))
+                print(f"\n✓ Sampled {len(entries)} entries")
                 
                 if entries:
                     print("\nFirst few videos:")
-                    for i, entry in enumerate(entries[:5], 1):
+                    for i, entry in enumerate(entries, 1):
                         if entry:
                             print(f"  {i}. {entry.get('title', 'Unknown')} (ID: {entry.get('id', 'N/A')})")
                         else:
@@ -3,6 +3,7 @@ Test script to verify setup and dependencies
 """
 import sys
 import importlib
+import importlib.util
 
 def test_imports():
     """Test if all required packages are installed"""
@@ -22,15 +23,9 @@ def test_imports():
     
     for package in required_packages:
         try:
-            # Handle package name differences
-            if package == 'dotenv':
-                importlib.import_module('dotenv')
-            elif package == 'yt_dlp':
-                importlib.import_module('yt_dlp')
-            elif package == 'sentence_transformers':
-                importlib.import_module('sentence_transformers')
-            elif package == 'pinecone':
-                # Check for pinecone package - newer versions use 'pinecone', not 'pinecone-client'
+            if package == 'pinecone':
+                # Check for pinecone package - newer versions use 'pinecone', not 'pinecone-client'.
+                # The rename conflict only shows up on import, so this one is really imported
                 try:
                     importlib.import_module('pinecone')
                 except Exception as e:
@@ -44,8 +39,9 @@ def test_imports():
                         continue
                     else:
                         raise
-            else:
-                importlib.import_module(package)
+            elif importlib.util.find_spec(package) is None:
+                # Only locates the package; doesn't run it (sentence_transformers would load torch)
+                raise ImportError(package)
             print(f"✓ {package} is installed")
         except ImportError as e:
             print(f"✗ {package} is NOT installed")
@@ -65,10 +61,8 @@ def test_imports():
 def test_env_file():
     """Test if .env file exists and has required variables"""
     import os
-    from pathlib import Path
     
-    env_path = Path('.env')
-    if not env_path.exists():
+    if not os.path.isfile('.env'):
         print("\n✗ .env file not found")
         print("Create it using: python setup_env.py")
         return False
@@ -79,8 +73,8 @@ def test_env_file():
     required_vars = ['PINECONE_API_KEY', 'PINECONE_ENVIRONMENT']
     missing_vars = []
     
-    for var in required_vars:
-        value = os.getenv(var)
+    env = {var: os.environ.get(var) for var in required_vars}
+    for var, value in env.items():
         if not value or value == f'your_{var.lower()}_here':
             print(f"✗ {var} is not set in .env file")
             missing_vars.append(var)
@@ -1,6 +1,9 @@
 import yt_dlp
 import os
-import glob
+
+def _iter_temp(prefix='temp_subs_'):
+    """Temp subtitle files in the current directory (one scandir pass, no glob)"""
+    return (entry for entry in os.scandir('.') if entry.name.startswith(prefix) and entry.is_file())
 
 def test_download_subs(video_url):
     output_template = 'temp_subs_%(id)s'
@@ -15,21 +18,22 @@ def test_download_subs(video_url):
     }
 
     # Clean up previous runs
-    for f in glob.glob('temp_subs_*'):
-        os.remove(f)
+    for entry in _iter_temp():
+        os.unlink(entry.path)
 
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(video_url, download=True)
         print(f"Downloaded info for {info['id']}")
         
         # Check for files
-        files = glob.glob('temp_subs_*')
+        files = [entry.path for entry in _iter_temp()]
         print(f"Files found: {files}")
         
         for f in files:
-            with open(f, 'r', encoding='utf-8') as file:
+            with open(f, 'rb') as file:
                 print(f"--- Content of {f} ---")
-                print(file.read()[:200])
+                # Only read what is printed; the file can be hundreds of KB
+                print(file.read(200).decode('utf-8', 'replace'))
                 print("--- End Content ---")
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 """
 Test script to check if a specific video has transcripts
 """
+import logging
 import sys
 from backend.youtube_scraper import YouTubeScraper
 
@@ -34,6 +35,8 @@ def test_video_transcript(video_url):
         return False
 
 if __name__ == "__main__":
+    # The scraper reports progress through the nptel.* loggers
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     # Test with a video from the playlist
     test_url = "https://www.youtube.com/watch?v=nC3T4sHo9eQ"  # Lecture 19 from the playlist
     
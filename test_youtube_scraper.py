@@ -1,6 +1,7 @@
 """
 Test script for YouTube scraper
 """
+import logging
 from backend.youtube_scraper import YouTubeScraper
 
 def test_single_video():
@@ -57,6 +58,8 @@ def test_playlist():
         print("\n✗ No videos found in playlist")
 
 if __name__ == "__main__":
+    # The scraper reports progress through the nptel.* loggers
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("=" * 50)
     print("YouTube Scraper Test")
     print("=" * 50)